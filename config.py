@@ -16,6 +16,21 @@ RABBITMQ_URL = os.environ["RABBITMQ_URL"]
 RABBITMQ_EXCHANGE = os.environ["RABBITMQ_EXCHANGE"]
 RABBITMQ_QUEUE_NAME = os.environ["RABBITMQ_QUEUE_NAME"]
 
+# body format of published messages, "json" or "msgpack" (consumers accept both)
+RABBITMQ_PUBLISH_FORMAT = os.environ.get("RABBITMQ_PUBLISH_FORMAT", "json")
+
+# confirm-enabled channels publishes are spread over
+RABBITMQ_PUBLISHER_CHANNELS = int(os.environ.get("RABBITMQ_PUBLISHER_CHANNELS", "10"))
+
+# consumer tuning: unacked deliveries the broker may push, and how acks are batched
+RABBITMQ_PREFETCH = int(os.environ.get("RABBITMQ_PREFETCH", "100"))
+ACK_BATCH_SIZE = int(os.environ.get("ACK_BATCH_SIZE", "50"))
+ACK_FLUSH_MS = int(os.environ.get("ACK_FLUSH_MS", "50"))
+
+# job results (jobs.completed / jobs.failed) are written to postgres in batches
+JOB_RESULT_BATCH_SIZE = int(os.environ.get("JOB_RESULT_BATCH_SIZE", "50"))
+JOB_RESULT_FLUSH_MS = int(os.environ.get("JOB_RESULT_FLUSH_MS", "50"))
+
 
 APP_NAME = os.environ["APP_NAME"]
 LOG_LEVEL = os.environ["LOG_LEVEL"]
@@ -48,5 +63,7 @@ REMINDER_JOB_MIN_RETRY_DELAY_SECONDS = int(
 APSCHEDULER_MISFIRE_GRACE_SECONDS = int(os.environ["APSCHEDULER_MISFIRE_GRACE_SECONDS"])
 
 CHECK_FOR_JOBS_INTERVAL_SECONDS = int(os.environ["CHECK_FOR_JOBS_INTERVAL_SECONDS"])
+# ready jobs picked up and dispatched concurrently per check
+CHECK_FOR_JOBS_BATCH_LIMIT = int(os.environ.get("CHECK_FOR_JOBS_BATCH_LIMIT", "20"))
 
 MFA_EXPIRY_JOB_INTERVAL_MINUTES = int(os.environ["MFA_EXPIRY_JOB_INTERVAL_MINUTES"])
@@ -0,0 +1,208 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple, Union
+from uuid import UUID
+
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError, StatementError
+
+from schemas.rabbitmq_events import JobCompletedEvent, JobFailedEvent
+from scheduler.repositories.job_repository import JobRepository
+from scheduler.database.postgres_database import get_db_context
+from scheduler.config import JOB_RESULT_BATCH_SIZE, JOB_RESULT_FLUSH_MS
+from custom_logging.custom_logger import get_logger
+
+clogger = get_logger()
+MODULE_NAME = "JOB_RESULT_BATCHER"
+LOG_PREFIX = f"[{MODULE_NAME}]"
+
+JobResultEvent = Union[JobCompletedEvent, JobFailedEvent]
+
+# SQLSTATE classes 22 (data exception), 23 (integrity constraint violation) and
+# 42 (syntax error or access rule violation, e.g. 42804 datatype mismatch)
+_PERMANENT_SQLSTATE_CLASSES = ("22", "23", "42")
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """
+    True for errors retrying the same events never fixes: the stored values themselves
+    (a NUL byte in a text or JSONB value, an out of range integer, a constraint violation)
+    or a statement postgres rejects whatever the connection state
+    """
+    if isinstance(error, (DataError, IntegrityError)):
+        return True
+    if isinstance(error, DBAPIError):
+        sqlstate = getattr(error.orig, "sqlstate", None)
+        if sqlstate:
+            return sqlstate[:2] in _PERMANENT_SQLSTATE_CLASSES
+        # asyncpg rejects arguments it cannot encode before sending them, as a ValueError
+        return isinstance(error.orig.__cause__, ValueError)
+    if isinstance(error, StatementError):
+        # bind values that could not be serialized
+        return isinstance(error.orig, (TypeError, ValueError))
+    return False
+
+
+class JobResultBatcher:
+    """
+    Collects job result events and writes them to postgres in one transaction per batch
+    (up to batch_size events or flush_interval_ms of waiting, whichever comes first).
+    submit() returns once the event's batch is committed, so the message is acked only after that.
+    A result postgres refuses to store only fails its own submit(), not the rest of its batch
+    """
+
+    def __init__(self, batch_size: int, flush_interval_ms: int):
+        self._batch_size = max(batch_size, 1)
+        self._flush_interval = flush_interval_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        # the batch being collected or flushed, kept here so stop() still sees it after a cancel
+        self._pending: List[Tuple[JobResultEvent, asyncio.Future]] = []
+
+    def start(self) -> None:
+        if self._task:
+            return
+
+        self._queue = asyncio.Queue()
+        self._batch_full = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        # commit whatever is still waiting so pending submit() calls are resolved
+        batch = [item for item in self._pending if not item[1].done()]
+        self._pending = []
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        if batch:
+            await self._flush(batch)
+
+    async def submit(self, event: JobResultEvent) -> None:
+        if not self._task:
+            raise RuntimeError(f"[{MODULE_NAME}] Batcher is not started")
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((event, future))
+        if self._queue.qsize() >= self._batch_size - 1:
+            self._batch_full.set()
+
+        await future
+
+    async def _run(self) -> None:
+        while True:
+            await self._next_batch()
+            await self._flush(self._pending)
+            self._pending = []
+
+    async def _next_batch(self) -> None:
+        """Collect the next batch into self._pending"""
+        self._pending.append(await self._queue.get())
+
+        if self._queue.qsize() < self._batch_size - 1:
+            self._batch_full.clear()
+            try:
+                await asyncio.wait_for(
+                    self._batch_full.wait(), timeout=self._flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+
+        while len(self._pending) < self._batch_size and not self._queue.empty():
+            self._pending.append(self._queue.get_nowait())
+
+    async def _flush(self, batch: List[Tuple[JobResultEvent, asyncio.Future]]) -> None:
+        # the last result for a job wins, same as applying the events one by one
+        latest: Dict[UUID, JobResultEvent] = {}
+        futures: Dict[UUID, List[asyncio.Future]] = defaultdict(list)
+        for event, future in batch:
+            latest[event.job_id] = event
+            futures[event.job_id].append(future)
+
+        await self._store(list(latest.values()), futures)
+
+    async def _store(
+        self,
+        events: List[JobResultEvent],
+        futures: Dict[UUID, List[asyncio.Future]],
+    ) -> None:
+        """
+        Write events in one transaction. A permanent error fails the whole transaction, so
+        the events are split in halves and retried until only the offending one fails.
+        An error no split fixes ends up failing every event on its own, none is requeued
+        """
+        completed = [e for e in events if isinstance(e, JobCompletedEvent)]
+        failed = [e for e in events if isinstance(e, JobFailedEvent)]
+
+        try:
+            async with get_db_context() as session:
+                job_repo = JobRepository(session)
+                updated = set(
+                    await job_repo.bulk_mark_completed(
+                        [
+                            (e.job_id, e.result, e.execution_duration_ms)
+                            for e in completed
+                        ]
+                    )
+                )
+                updated.update(
+                    await job_repo.bulk_mark_failed(
+                        [(e.job_id, e.error_message or "unknown") for e in failed]
+                    )
+                )
+        except Exception as e:
+            if len(events) > 1 and is_permanent_error(e):
+                middle = len(events) // 2
+                await self._store(events[:middle], futures)
+                await self._store(events[middle:], futures)
+                return
+
+            clogger.error(
+                "%s Failed to store batch of %d job results: %s",
+                LOG_PREFIX,
+                len(events),
+                e,
+                exc_info=True,
+            )
+            for event in events:
+                for future in futures[event.job_id]:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for event in events:
+            if event.job_id not in updated:
+                # acked anyway, requeueing a result for a job that does not exist never succeeds
+                clogger.error(
+                    "%s Result for unknown job %s was dropped", LOG_PREFIX, event.job_id
+                )
+
+        for event in completed:
+            if event.job_id in updated:
+                clogger.info(
+                    "%s Job %s completed successfully", LOG_PREFIX, event.job_id
+                )
+        for event in failed:
+            if event.job_id in updated:
+                clogger.warning(
+                    "%s Job %s failed: %s",
+                    LOG_PREFIX,
+                    event.job_id,
+                    event.error_message,
+                )
+
+        for event in events:
+            for future in futures[event.job_id]:
+                if not future.done():
+                    future.set_result(None)
+
+
+job_result_batcher = JobResultBatcher(JOB_RESULT_BATCH_SIZE, JOB_RESULT_FLUSH_MS)
@@ -1,77 +1,72 @@
-from typing import Dict, Any
+import logging
+from typing import Any, Dict, Union
 
-from rabbitmq.rabbitmq_controller import rabbitmq_controller
-from schemas.rabbitmq_events import (
-    JobEvent,
-    parse_job_event,
-    JobCompletedEvent,
-    JobFailedEvent,
-)
-from scheduler.repositories.job_repository import JobRepository
-from scheduler.database.postgres_database import get_db_context
+from rabbitmq.rabbitmq_controller import UnprocessableMessageError, rabbitmq_controller
+from schemas.rabbitmq_events import JobEventTypeEnum, parse_job_event
+from scheduler.consumers.job_result_batcher import is_permanent_error, job_result_batcher
 from scheduler.config import RABBITMQ_QUEUE_NAME
 from custom_logging.custom_logger import get_logger
 
 clogger = get_logger()
 MODULE_NAME = "JOB_RESULT_CONSUMER"
+LOG_PREFIX = f"[{MODULE_NAME}]"
 
+RESULT_EVENT_TYPES = (JobEventTypeEnum.JOB_COMPLETED, JobEventTypeEnum.JOB_FAILED)
 
-async def process_job_result_event(event_dict: Dict[str, Any]) -> None:
+
+async def process_job_result_event(event_dict: Union[Dict[str, Any], bytes]) -> None:
+    """
+    Unparseable events are logged and dropped. Results postgres refuses to store are
+    rejected without requeue, any other error is raised so the message is rejected
+    and requeued instead of acked with its result lost
+    """
     try:
-        clogger.debug(
-            f"[{MODULE_NAME}] Processing job result event, data:  {event_dict}"
-        )
+        if clogger.isEnabledFor(logging.DEBUG):
+            clogger.debug(
+                "%s Processing job result event, data: %s", LOG_PREFIX, event_dict
+            )
         event = parse_job_event(event_dict)
 
-        if isinstance(event, JobCompletedEvent):
-            await _process_successful_job(event)
-        elif isinstance(event, JobFailedEvent):
-            await _process_failed_job(event)
+        if event.event_type in RESULT_EVENT_TYPES:
+            await job_result_batcher.submit(event)
         else:
-            clogger.error(f"[{MODULE_NAME}] Unknown job event passed for processing")
+            clogger.error("%s Unknown job event passed for processing", LOG_PREFIX)
     except ValueError as e:
-        clogger.error(f"[{MODULE_NAME}] Failed to parse job event: {e}", exc_info=True)
+        clogger.error("%s Failed to parse job event: %s", LOG_PREFIX, e, exc_info=True)
     except Exception as e:
+        if is_permanent_error(e):
+            raise UnprocessableMessageError(f"job result cannot be stored: {e}") from e
         clogger.error(
-            f"[{MODULE_NAME}] Error processing job result event: {e}", exc_info=True
-        )
-
-
-async def _process_successful_job(job_event: JobCompletedEvent):
-    async with get_db_context() as session:
-        job_repo = JobRepository(session)
-        await job_repo.mark_completed(
-            job_id=job_event.job_id,
-            result=job_event.result,
-            duration_ms=job_event.execution_duration_ms,
-        )
-        clogger.info(f"[{MODULE_NAME}] Job {job_event.job_id} completed successfully")
-
-
-async def _process_failed_job(job_event: JobFailedEvent):
-    async with get_db_context() as session:
-        job_repo = JobRepository(session)
-        err_msg = job_event.error_message if job_event.error_message else "unknown"
-        await job_repo.mark_failed(job_id=job_event.job_id, error_message=err_msg)
-        clogger.warning(
-            f"[{MODULE_NAME}] Job {job_event.job_id} failed: {job_event.error_message}"
+            "%s Error processing job result event: %s", LOG_PREFIX, e, exc_info=True
         )
+        raise
 
 
 async def start_job_result_consumer() -> None:
     try:
+        job_result_batcher.start()
         await rabbitmq_controller.consume(
             queue_name=RABBITMQ_QUEUE_NAME,
             routing_keys=["jobs.completed", "jobs.failed"],
             callback=process_job_result_event,
             auto_ack=False,
+            # JSON results are parsed straight into the event models
+            decode_json=False,
         )
         clogger.info(
-            f"[{MODULE_NAME}] Started consuming job results from RabbitMQ "
-            f"(queue: {RABBITMQ_QUEUE_NAME})"
+            "%s Started consuming job results from RabbitMQ (queue: %s)",
+            LOG_PREFIX,
+            RABBITMQ_QUEUE_NAME,
         )
     except Exception as e:
         clogger.error(
-            f"[{MODULE_NAME}] Failed to start job result consumer: {e}", exc_info=True
+            "%s Failed to start job result consumer: %s", LOG_PREFIX, e, exc_info=True
         )
         raise
+
+
+async def stop_job_result_consumer() -> None:
+    # no new deliveries first, then the batcher flushes the results already received
+    await rabbitmq_controller.cancel(RABBITMQ_QUEUE_NAME)
+    await job_result_batcher.stop()
+    clogger.info("%s Flushed pending job results", LOG_PREFIX)
@@ -1,13 +1,17 @@
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 import sys
-from datetime import datetime
+import threading
+import time
 from pathlib import Path
 from typing import Optional, Dict, Any
-import json
 import traceback
 
+import orjson
+
 
 from scheduler.config import (
     APP_NAME,
@@ -20,7 +24,93 @@ from scheduler.config import (
 )
 
 
+_timestamp_cache = (-1, "")
+
+
+def _format_timestamp(created: float) -> str:
+    """ISO 8601 UTC timestamp, the part up to seconds is reused for records within the same second"""
+    global _timestamp_cache
+
+    seconds = int(created)
+    cached_seconds, prefix = _timestamp_cache
+    if cached_seconds != seconds:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _timestamp_cache = (seconds, prefix)
+
+    return f"{prefix}.{int((created - seconds) * 1_000_000):06d}+00:00"
+
+
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+class _LocalQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler for an in-process listener. The message and exception text are rendered
+    on the calling thread, only the handlers' own formatting is left to the listener thread
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # %-args may be mutable (dicts, ORM objects), freeze them as they are at the call
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+        return record
+
+
+class FastRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotating file handler that keeps its own count of the file size instead of seeking the stream
+    for every record, the count is resynced with the real file size every SIZE_RESYNC_RECORDS records
+    """
+
+    SIZE_RESYNC_RECORDS = 1000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._bytes_written = self._file_size()
+        self._records_since_resync = 0
+
+    def _file_size(self) -> int:
+        try:
+            return os.path.getsize(self.baseFilename)
+        except OSError:
+            return 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            # formatted once, the stock handler formats again in shouldRollover
+            msg = self.format(record) + self.terminator
+
+            # sizes are counted in characters, same as RotatingFileHandler
+            if self.maxBytes > 0 and self._bytes_written + len(msg) >= self.maxBytes:
+                self.doRollover()
+
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(msg)
+            self.flush()
+
+            self._bytes_written += len(msg)
+            self._records_since_resync += 1
+            if self._records_since_resync >= self.SIZE_RESYNC_RECORDS:
+                self._bytes_written = self._file_size()
+                self._records_since_resync = 0
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self._bytes_written = 0
+        self._records_since_resync = 0
+
+
 class ProdLogger:
+    # log dirs already created by this process
+    _created_log_dirs: set = set()
+
     def __init__(
         self,
         name: str,
@@ -39,9 +129,17 @@ class ProdLogger:
         self.console_output = console_output
         self.json_logging = json_logging
 
-        self.log_dir.mkdir(parents=True, exist_ok=True)
+        if self.log_dir not in ProdLogger._created_log_dirs:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            ProdLogger._created_log_dirs.add(self.log_dir)
 
+        self._file_handlers: list[logging.Handler] = []
+        # handlers of the same kind share one formatter instance
+        self._detailed_formatter: Optional[logging.Formatter] = None
+        self._json_formatter: Optional[logging.Formatter] = None
+        self._listener: Optional[logging.handlers.QueueListener] = None
         self.logger = self._setup_logger()
+        atexit.register(self.shutdown)
 
     def _setup_logger(self) -> logging.Logger:
         """Set up the logger with appropriate handlers and formatters"""
@@ -55,11 +153,31 @@ class ProdLogger:
         if self.console_output:
             logger.addHandler(self._create_console_handler())
 
-        logger.addHandler(self._create_file_handler())
-        logger.addHandler(self._create_error_file_handler())
+        # file writes and rollovers happen on the listener thread, not on the event loop
+        self._file_handlers = [
+            self._create_file_handler(),
+            self._create_error_file_handler(),
+        ]
+        log_queue: queue.Queue = queue.Queue(-1)
+        logger.addHandler(_LocalQueueHandler(log_queue))
+        self._listener = logging.handlers.QueueListener(
+            log_queue, *self._file_handlers, respect_handler_level=True
+        )
+        self._listener.start()
 
         return logger
 
+    def shutdown(self) -> None:
+        """Write out queued records and close all handlers"""
+        if self._listener:
+            self._listener.stop()
+            self._listener = None
+
+        for handler in [*self.logger.handlers, *self._file_handlers]:
+            handler.close()
+        self.logger.handlers.clear()
+        self._file_handlers = []
+
     def _create_console_handler(self) -> logging.StreamHandler:
         """Create console handler with colored output"""
         handler = logging.StreamHandler(sys.stdout)
@@ -72,11 +190,11 @@ class ProdLogger:
 
         return handler
 
-    def _create_file_handler(self) -> logging.handlers.RotatingFileHandler:
+    def _create_file_handler(self) -> FastRotatingFileHandler:
         """Create rotating file handler for all logs"""
         log_file = self.log_dir / f"{self.name.lower()}.log"
 
-        handler = logging.handlers.RotatingFileHandler(
+        handler = FastRotatingFileHandler(
             log_file,
             maxBytes=self.max_file_size,
             backupCount=self.backup_count,
@@ -91,11 +209,11 @@ class ProdLogger:
 
         return handler
 
-    def _create_error_file_handler(self) -> logging.handlers.RotatingFileHandler:
+    def _create_error_file_handler(self) -> FastRotatingFileHandler:
         """Create separate rotating file handler for errors only"""
         error_log_file = self.log_dir / f"{self.name.lower()}_errors.log"
 
-        handler = logging.handlers.RotatingFileHandler(
+        handler = FastRotatingFileHandler(
             error_log_file,
             maxBytes=self.max_file_size,
             backupCount=self.backup_count,
@@ -125,36 +243,52 @@ class ProdLogger:
                 "RESET": "\033[0m",  # Reset
             }
 
-            def format(self, record):
-                log_color = self.COLORS.get(record.levelname, self.COLORS["RESET"])
+            def __init__(self):
+                super().__init__()
                 reset = self.COLORS["RESET"]
+                # one formatter per level, built once instead of on every record
+                self._formatters = {
+                    level: logging.Formatter(
+                        # f'{color}%(asctime)s - %(name)s - %(levelname)s{reset} - %(message)s',
+                        f"{color}%(asctime)s - %(levelname)s{reset} - %(message)s",
+                        datefmt="%Y-%m-%d %H:%M:%S",
+                    )
+                    for level, color in self.COLORS.items()
+                }
 
-                formatter = logging.Formatter(
-                    # f'{log_color}%(asctime)s - %(name)s - %(levelname)s{reset} - %(message)s',
-                    f"{log_color}%(asctime)s - %(levelname)s{reset} - %(message)s",
-                    datefmt="%Y-%m-%d %H:%M:%S",
+            def format(self, record):
+                formatter = self._formatters.get(
+                    record.levelname, self._formatters["RESET"]
                 )
-
                 return formatter.format(record)
 
         return ColoredFormatter()
 
     def _create_detailed_formatter(self) -> logging.Formatter:
         """Create detailed formatter for file output"""
-        return logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(funcName)s() - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
+        if self._detailed_formatter is None:
+            self._detailed_formatter = logging.Formatter(
+                "%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(funcName)s() - %(message)s",
+                datefmt="%Y-%m-%d %H:%M:%S",
+            )
+        return self._detailed_formatter
 
     def _create_json_formatter(self) -> logging.Formatter:
         """Create JSON formatter for structured logging"""
+        if self._json_formatter is not None:
+            return self._json_formatter
 
         class JSONFormatter(logging.Formatter):
             """JSON formatter for structured logging"""
 
             def format(self, record):
+                # console and file handlers share the JSON line of a record
+                cached = getattr(record, "_json_line", None)
+                if cached is not None:
+                    return cached
+
                 log_entry = {
-                    "timestamp": datetime.fromtimestamp(record.created).isoformat(),
+                    "timestamp": _format_timestamp(record.created),
                     "level": record.levelname,
                     "logger": record.name,
                     "message": record.getMessage(),
@@ -167,75 +301,89 @@ class ProdLogger:
                 }
 
                 if record.exc_info:
-                    log_entry["exception"] = self.formatException(record.exc_info)
+                    if not record.exc_text:
+                        record.exc_text = self.formatException(record.exc_info)
+                    log_entry["exception"] = record.exc_text
 
                 if hasattr(record, "extra_data"):
                     log_entry["extra"] = record.extra_data
 
-                return json.dumps(log_entry, ensure_ascii=False)
+                record._json_line = orjson.dumps(
+                    log_entry,
+                    default=str,
+                    option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+                ).decode()
+                return record._json_line
 
-        return JSONFormatter()
+        self._json_formatter = JSONFormatter()
+        return self._json_formatter
 
-    def info(self, message: str, extra_data: Optional[Dict[str, Any]] = None):
-        """Log info message with optional structured data"""
-        self._log_with_extra(logging.INFO, message, extra_data)
+    def isEnabledFor(self, level: int) -> bool:
+        """Check level before building expensive log arguments"""
+        return self.logger.isEnabledFor(level)
 
-    def debug(self, message: str, extra_data: Optional[Dict[str, Any]] = None):
-        """Log debug message with optional structured data"""
-        self._log_with_extra(logging.DEBUG, message, extra_data)
+    def info(
+        self, message: str, *args: Any, extra_data: Optional[Dict[str, Any]] = None
+    ):
+        """Log info message with optional %-style args and structured data"""
+        self._log_with_extra(logging.INFO, message, args, extra_data)
+
+    def debug(
+        self, message: str, *args: Any, extra_data: Optional[Dict[str, Any]] = None
+    ):
+        """Log debug message with optional %-style args and structured data"""
+        self._log_with_extra(logging.DEBUG, message, args, extra_data)
 
-    def warning(self, message: str, extra_data: Optional[Dict[str, Any]] = None):
-        """Log warning message with optional structured data"""
-        self._log_with_extra(logging.WARNING, message, extra_data)
+    def warning(
+        self, message: str, *args: Any, extra_data: Optional[Dict[str, Any]] = None
+    ):
+        """Log warning message with optional %-style args and structured data"""
+        self._log_with_extra(logging.WARNING, message, args, extra_data)
 
     def error(
         self,
         message: str,
+        *args: Any,
         extra_data: Optional[Dict[str, Any]] = None,
         exc_info: bool = False,
     ):
         """Log error message with optional structured data and exception info"""
-        if exc_info:
-            self.logger.error(
-                message,
-                exc_info=True,
-                extra={"extra_data": extra_data} if extra_data else {},
-            )
-        else:
-            self._log_with_extra(logging.ERROR, message, extra_data)
+        self._log_with_extra(logging.ERROR, message, args, extra_data, exc_info)
 
     def critical(
         self,
         message: str,
+        *args: Any,
         extra_data: Optional[Dict[str, Any]] = None,
         exc_info: bool = False,
     ):
-        """Log critical messcreate_age with optional structured data and exception info"""
-        if exc_info:
-            self.logger.critical(
-                message,
-                exc_info=True,
-                extra={"extra_data": extra_data} if extra_data else {},
-            )
-        else:
-            self._log_with_extra(logging.CRITICAL, message, extra_data)
+        """Log critical message with optional structured data and exception info"""
+        self._log_with_extra(logging.CRITICAL, message, args, extra_data, exc_info)
 
-    def exception(self, message: str, extra_data: Optional[Dict[str, Any]] = None):
+    def exception(
+        self, message: str, *args: Any, extra_data: Optional[Dict[str, Any]] = None
+    ):
         """Log exception with full traceback"""
-        self.logger.error(
-            message,
-            exc_info=True,
-            extra={"extra_data": extra_data} if extra_data else {},
-        )
+        self._log_with_extra(logging.ERROR, message, args, extra_data, True)
 
     def _log_with_extra(
-        self, level: int, message: str, extra_data: Optional[Dict[str, Any]]
+        self,
+        level: int,
+        message: str,
+        args: tuple,
+        extra_data: Optional[Dict[str, Any]],
+        exc_info: bool = False,
     ):
-        """Internal method to log with extra structured data"""
+        """Internal method to log with extra structured data, args are formatted lazily by logging"""
+        if not self.logger.isEnabledFor(level):
+            return
+
         if extra_data:
-            self.logger.log(level, message, extra={"extra_data": extra_data})
+            self.logger.log(
+                level, message, *args, exc_info=exc_info, extra={"extra_data": extra_data}
+            )
         else:
-            self.logger.log(level, message)
+            self.logger.log(level, message, *args, exc_info=exc_info)
 
     def log_performance(
         self,
@@ -253,7 +401,9 @@ class ProdLogger:
         if extra_data:
             perf_data.update(extra_data)
 
-        self.info(f"Performance: {operation} completed in {duration:.3f}s", perf_data)
+        self.info(
+            "Performance: %s completed in %.3fs", operation, duration, extra_data=perf_data
+        )
 
     def log_api_call(
         self,
@@ -276,14 +426,16 @@ class ProdLogger:
         level = logging.INFO if 200 <= status_code < 400 else logging.ERROR
         message = f"API {method} {url} -> {status_code} ({duration:.3f}s)"
 
-        self._log_with_extra(level, message, api_data)
+        self._log_with_extra(level, message, (), api_data)
 
     def set_level(self, level: str):
         """Change logging level at runtime"""
         new_level = getattr(logging, level.upper())
         self.logger.setLevel(new_level)
 
-        for handler in self.logger.handlers:
+        for handler in [*self.logger.handlers, *self._file_handlers]:
+            if isinstance(handler, logging.handlers.QueueHandler):
+                continue
             if isinstance(handler, logging.StreamHandler) and not isinstance(
                 handler, logging.handlers.RotatingFileHandler
             ):
@@ -294,6 +446,7 @@ class ProdLogger:
 
 
 _global_logger: Optional[ProdLogger] = None
+_global_logger_lock = threading.RLock()
 
 
 def setup_production_logger(
@@ -307,19 +460,25 @@ def setup_production_logger(
 ) -> ProdLogger:
     global _global_logger
 
-    print(f"Setting up logger with level: {log_level}")
-
-    _global_logger = ProdLogger(
-        name=name,
-        log_level=log_level,
-        log_dir=log_dir,
-        max_file_size=max_file_size,
-        backup_count=backup_count,
-        console_output=console_output,
-        json_logging=json_logging,
-    )
+    with _global_logger_lock:
+        print(f"Setting up logger with level: {log_level}")
+
+        # release the previous logger's queue thread and open log files before replacing it
+        if _global_logger is not None:
+            _global_logger.shutdown()
+            atexit.unregister(_global_logger.shutdown)
+
+        _global_logger = ProdLogger(
+            name=name,
+            log_level=log_level,
+            log_dir=log_dir,
+            max_file_size=max_file_size,
+            backup_count=backup_count,
+            console_output=console_output,
+            json_logging=json_logging,
+        )
 
-    return _global_logger
+        return _global_logger
 
 
 def get_logger() -> ProdLogger:
@@ -327,7 +486,9 @@ def get_logger() -> ProdLogger:
     global _global_logger
 
     if _global_logger is None:
-        _global_logger = setup_production_logger()
+        with _global_logger_lock:
+            if _global_logger is None:
+                _global_logger = setup_production_logger()
 
     return _global_logger
 
@@ -1,17 +1,30 @@
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import DeclarativeBase
 from scheduler.config import SCHEDULER_POSTGRES_DATABASE_URL
 
-Base = declarative_base()
+
+class Base(DeclarativeBase):
+    pass
+
 
 engine = create_async_engine(
     SCHEDULER_POSTGRES_DATABASE_URL,
     echo=False,
+    echo_pool=False,
     pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
+    # fixed size pool, a burst waits briefly for a connection instead of churning overflow ones
+    pool_size=20,
+    max_overflow=0,
+    pool_timeout=5,
+    pool_recycle=1800,
+    isolation_level="READ COMMITTED",
+    connect_args={
+        # asyncpg's own statement cache and sqlalchemy's prepared statement cache
+        "statement_cache_size": 1024,
+        "prepared_statement_cache_size": 512,
+    },
 )
 
 async_session_factory = async_sessionmaker(
@@ -47,9 +60,17 @@ async def get_db_context() -> AsyncGenerator[AsyncSession, None]:
             raise
 
 
+def _create_missing_indexes(sync_conn) -> None:
+    # create_all only creates indexes together with a new table
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
 async def create_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_missing_indexes)
 
 
 async def drop_tables():
@@ -2,19 +2,19 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
 from scheduler.config import APSCHEDULER_MISFIRE_GRACE_SECONDS
-from scheduler.jobs.periodic.cleanup.mfa_expiry_cleanup_job import (
-    run_mfa_expiry_cleanup,
+from scheduler.jobs.periodic.cleanup.cleanup_jobs import (
+    TICK_INTERVAL_MINUTES,
+    enqueue_due_cleanups,
 )
 
 
 async def initialize_cleanup_jobs(scheduler: AsyncIOScheduler) -> None:
+    # a single entry for all cleanups, see CLEANUP_JOBS
     scheduler.add_job(
-        run_mfa_expiry_cleanup,
-        trigger=IntervalTrigger(minutes=1),
-        id="mfa_expiry_cleanup",
-        name="MFA Expiry Cleanup",
+        enqueue_due_cleanups,
+        trigger=IntervalTrigger(minutes=TICK_INTERVAL_MINUTES),
+        id="enqueue_due_cleanups",
+        name="Enqueue Due Cleanups",
         replace_existing=True,
         misfire_grace_time=APSCHEDULER_MISFIRE_GRACE_SECONDS,
     )
-
-    # todo other jobs
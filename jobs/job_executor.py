@@ -1,89 +1,107 @@
-import asyncio
-from uuid import UUID
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from rabbitmq.rabbitmq_controller import rabbitmq_controller
 from schemas.rabbitmq_events import JobExecuteEvent, JobEventTypeEnum
-from scheduler.models.job import Job, JobStatusEnum
+from scheduler.models.job import Job
 from scheduler.repositories.job_repository import JobRepository
 from scheduler.database.postgres_database import get_db_context
+from scheduler.jobs.timeout_monitor import timeout_monitor
 from utils.timezone_utils import now_utc
 from custom_logging.custom_logger import get_logger
 
 clogger = get_logger()
 MODULE_NAME = "JOB_EXECUTOR"
+LOG_PREFIX = f"[{MODULE_NAME}]"
 
 
 class JobExecutor:
     @staticmethod
-    async def execute_job(job: Job) -> bool:
-        try:
-            async with get_db_context() as session:
-                job_repo = JobRepository(session)
-                await job_repo.mark_sent(job.job_id)
+    async def execute_job(job: Job, session: Optional[AsyncSession] = None) -> bool:
+        results = await JobExecutor.execute_batch([job], session=session)
+        return results[0]
 
-            event = JobExecuteEvent(
-                event_type=JobEventTypeEnum.JOB_EXECUTE,
-                job_id=job.job_id,
-                job_type=job.job_type.value,
-                scheduled_for=job.scheduled_for,
-                sent_at=now_utc(),
-                timeout_seconds=job.timeout_seconds,
-                metadata=job.job_metadata or {},
-            )
+    @staticmethod
+    async def execute_batch(
+        jobs: List[Job], session: Optional[AsyncSession] = None
+    ) -> List[bool]:
+        """
+        Publish all jobs without waiting on each confirm, then mark the published ones sent
+        in one UPDATE. Pass the session the jobs were selected (and locked) with so the status
+        change joins that transaction, otherwise it is committed on its own.
+        Returns per-job success
+        """
+        if not jobs:
+            return []
 
-            success = await rabbitmq_controller.publish(
-                routing_key=f"jobs.execute.{job.job_type.value}",
-                message=event.model_dump(mode="json"),
-                persistent=True,
-            )
+        payloads = [await JobExecutor._encode_execute_event(job) for job in jobs]
+        published = await rabbitmq_controller.publish_many(
+            [
+                (f"jobs.execute.{job.job_type.value}", payload)
+                for job, payload in zip(jobs, payloads)
+            ],
+            persistent=True,
+        )
 
-            if success:
-                clogger.info(
-                    f"[{MODULE_NAME}] Job {job.job_id} ({job.job_type.value}) "
-                    f"published to RabbitMQ"
+        for job, ok in zip(jobs, published):
+            if not ok:
+                clogger.error(
+                    "%s Failed to publish job %s to RabbitMQ", LOG_PREFIX, job.job_id
                 )
 
-                asyncio.create_task(
-                    JobExecutor._monitor_job_timeout(job.job_id, job.timeout_seconds)
-                )
+        sent_jobs = [job for job, ok in zip(jobs, published) if ok]
+        if not sent_jobs:
+            return published
 
-                return True
+        sent_ids = [job.job_id for job in sent_jobs]
+        try:
+            if session is None:
+                async with get_db_context() as own_session:
+                    attempts = await JobRepository(own_session).bulk_mark_sent(sent_ids)
             else:
-                clogger.error(
-                    f"[{MODULE_NAME}] Failed to publish job {job.job_id} to RabbitMQ"
-                )
-                return False
-
+                attempts = await JobRepository(session).bulk_mark_sent(sent_ids)
         except Exception as e:
+            # already published, the backend runs them but they will be picked up again
             clogger.error(
-                f"[{MODULE_NAME}] Error executing job {job.job_id}: {e}", exc_info=True
+                "%s Error marking %d published jobs as sent: %s",
+                LOG_PREFIX,
+                len(sent_ids),
+                e,
+                exc_info=True,
             )
-            return False
+            return [False] * len(jobs)
 
-    @staticmethod
-    async def _monitor_job_timeout(job_id: UUID, timeout_seconds: int) -> None:
-        await asyncio.sleep(timeout_seconds)
+        for job in sent_jobs:
+            clogger.info(
+                "%s Job %s (%s) published to RabbitMQ",
+                LOG_PREFIX,
+                job.job_id,
+                job.job_type.value,
+            )
+            if job.job_id in attempts:
+                await timeout_monitor.arm(
+                    job.job_id, time.time() + job.timeout_seconds, attempts[job.job_id]
+                )
 
-        try:
-            async with get_db_context() as session:
-                job_repo = JobRepository(session)
-                job = await job_repo.get_by_id(job_id)
+        return published
 
-                if job and job.status == JobStatusEnum.SENT:
-                    await job_repo.mark_timeout(job_id)
-                    clogger.warning(
-                        f"[{MODULE_NAME}] Job {job_id} timed out after "
-                        f"{timeout_seconds} seconds"
-                    )
+    @staticmethod
+    async def _encode_execute_event(job: Job) -> bytes:
+        # job metadata is unbounded, big events are encoded off the loop
+        return await rabbitmq_controller.encode_event_offloaded(
+            JobExecutor._build_execute_event(job)
+        )
 
-                    if job.is_retriable():
-                        clogger.info(
-                            f"[{MODULE_NAME}] Job {job_id} will be retried later by retrier logic"
-                            f"(attempt {job.attempts_count}/{job.max_attempts})"
-                        )
-        except Exception as e:
-            clogger.error(
-                f"[{MODULE_NAME}] Error monitoring timeout for job {job_id}: {e}",
-                exc_info=True,
-            )
+    @staticmethod
+    def _build_execute_event(job: Job) -> JobExecuteEvent:
+        return JobExecuteEvent(
+            event_type=JobEventTypeEnum.JOB_EXECUTE,
+            job_id=job.job_id,
+            job_type=job.job_type.value,
+            scheduled_for=job.scheduled_for,
+            sent_at=now_utc(),
+            timeout_seconds=job.timeout_seconds,
+            metadata=job.job_metadata or {},
+        )
@@ -0,0 +1,101 @@
+import asyncio
+from typing import Optional
+
+import asyncpg
+
+from scheduler.config import (
+    CHECK_FOR_JOBS_BATCH_LIMIT,
+    SCHEDULER_POSTGRES_DB,
+    SCHEDULER_POSTGRES_HOST,
+    SCHEDULER_POSTGRES_PASSWORD,
+    SCHEDULER_POSTGRES_PORT,
+    SCHEDULER_POSTGRES_USER,
+)
+from scheduler.models.job import JOB_READY_NOTIFY_CHANNEL
+from scheduler.jobs.periodic.periodic_checker_job import check_and_execute_ready_jobs
+from custom_logging.custom_logger import get_logger
+
+clogger = get_logger()
+MODULE_NAME = "JOB_READY_LISTENER"
+LOG_PREFIX = f"[{MODULE_NAME}]"
+
+RECONNECT_DELAY_SECONDS = 5
+
+
+class JobReadyListener:
+    """
+    LISTENs on the job ready channel over a dedicated connection and dispatches ready jobs
+    as soon as postgres notifies, notifications that arrive during a dispatch are coalesced.
+    The periodic checker stays scheduled as a safety net (future scheduled_for, retries)
+    """
+
+    def __init__(self):
+        self._wakeup: Optional[asyncio.Event] = None
+        self._listen_task: Optional[asyncio.Task] = None
+        self._dispatch_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._listen_task:
+            return
+
+        self._wakeup = asyncio.Event()
+        self._listen_task = asyncio.create_task(self._listen())
+        self._dispatch_task = asyncio.create_task(self._dispatch())
+
+    async def stop(self) -> None:
+        for task in (self._listen_task, self._dispatch_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._listen_task = None
+        self._dispatch_task = None
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self._wakeup.set()
+
+    async def _listen(self) -> None:
+        while True:
+            connection: Optional[asyncpg.Connection] = None
+            try:
+                connection = await asyncpg.connect(
+                    host=SCHEDULER_POSTGRES_HOST,
+                    port=SCHEDULER_POSTGRES_PORT,
+                    user=SCHEDULER_POSTGRES_USER,
+                    password=SCHEDULER_POSTGRES_PASSWORD,
+                    database=SCHEDULER_POSTGRES_DB,
+                )
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(JOB_READY_NOTIFY_CHANNEL, self._on_notify)
+                clogger.info(
+                    "%s Listening on channel '%s'", LOG_PREFIX, JOB_READY_NOTIFY_CHANNEL
+                )
+
+                # pick up whatever became ready while we were not listening
+                self._wakeup.set()
+                await closed.wait()
+                clogger.warning("%s Listener connection closed", LOG_PREFIX)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                clogger.error("%s Listener connection failed: %s", LOG_PREFIX, e)
+            finally:
+                if connection and not connection.is_closed():
+                    await connection.close()
+
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def _dispatch(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            # a full batch means more jobs may be waiting
+            while await check_and_execute_ready_jobs() >= CHECK_FOR_JOBS_BATCH_LIMIT:
+                pass
+
+
+job_ready_listener = JobReadyListener()
@@ -0,0 +1,98 @@
+import time
+from typing import Dict, List, NamedTuple
+
+from scheduler.config import (
+    CLEANUP_JOB_MAX_RETRIES,
+    CLEANUP_JOB_MIN_RETRY_DELAY_SECONDS,
+    CLEANUP_JOB_TIMEOUT_SECONDS,
+    MFA_EXPIRY_JOB_INTERVAL_MINUTES,
+)
+from scheduler.database.postgres_database import get_db_context
+from scheduler.models.job import JobTypeEnum
+from scheduler.repositories.job_repository import JobRepository
+from utils.timezone_utils import now_utc
+from custom_logging.custom_logger import get_logger
+
+clogger = get_logger()
+MODULE_NAME = "CLEANUP_JOBS"
+LOG_PREFIX = f"[{MODULE_NAME}]"
+
+
+class CleanupJob(NamedTuple):
+    job_type: JobTypeEnum
+    interval_minutes: int
+    timeout_seconds: int
+    max_attempts: int
+    min_retry_delay_seconds: int
+
+
+# every periodic cleanup, new ones only need an entry here
+CLEANUP_JOBS: List[CleanupJob] = [
+    CleanupJob(
+        job_type=JobTypeEnum.MFA_EXPIRY_CLEANUP,
+        interval_minutes=MFA_EXPIRY_JOB_INTERVAL_MINUTES,
+        timeout_seconds=CLEANUP_JOB_TIMEOUT_SECONDS,
+        max_attempts=CLEANUP_JOB_MAX_RETRIES,
+        min_retry_delay_seconds=CLEANUP_JOB_MIN_RETRY_DELAY_SECONDS,
+    ),
+]
+
+# the tick runs at the shortest cadence, longer ones are due every few ticks
+TICK_INTERVAL_MINUTES = min(cleanup.interval_minutes for cleanup in CLEANUP_JOBS)
+
+# monotonic time each cleanup was last enqueued
+_last_enqueued: Dict[JobTypeEnum, float] = {}
+
+
+def _due_cleanups() -> List[CleanupJob]:
+    now = time.monotonic()
+    # half a tick of slack so scheduler jitter never pushes a cleanup to the next tick
+    slack = TICK_INTERVAL_MINUTES * 30
+    return [
+        cleanup
+        for cleanup in CLEANUP_JOBS
+        if cleanup.job_type not in _last_enqueued
+        or now - _last_enqueued[cleanup.job_type] >= cleanup.interval_minutes * 60 - slack
+    ]
+
+
+async def enqueue_due_cleanups() -> None:
+    """
+    Create every due cleanup job in one INSERT, committed as pending. The commit notifies
+    the job ready listener, the locked ready-jobs select it shares with the periodic checker
+    is the only path that publishes them
+    """
+    try:
+        due = _due_cleanups()
+        if not due:
+            return
+
+        scheduled_for = now_utc()
+        async with get_db_context() as session:
+            jobs = await JobRepository(session).bulk_insert(
+                [
+                    {
+                        "job_type": cleanup.job_type,
+                        "scheduled_for": scheduled_for,
+                        "timeout_seconds": cleanup.timeout_seconds,
+                        "max_attempts": cleanup.max_attempts,
+                        "min_retry_delay_seconds": cleanup.min_retry_delay_seconds,
+                        "job_metadata": {},
+                    }
+                    for cleanup in due
+                ]
+            )
+
+        clogger.info(
+            "%s Created %d cleanup jobs: %s",
+            LOG_PREFIX,
+            len(jobs),
+            ", ".join(f"{job.job_type.value}={job.job_id}" for job in jobs),
+        )
+
+        enqueued_at = time.monotonic()
+        for cleanup in due:
+            _last_enqueued[cleanup.job_type] = enqueued_at
+
+    except Exception as e:
+        clogger.error("%s Error enqueuing cleanup jobs: %s", LOG_PREFIX, e, exc_info=True)
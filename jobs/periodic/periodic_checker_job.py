@@ -1,3 +1,4 @@
+from scheduler.config import CHECK_FOR_JOBS_BATCH_LIMIT
 from scheduler.repositories.job_repository import JobRepository
 from scheduler.database.postgres_database import get_db_context
 from scheduler.jobs.job_executor import JobExecutor
@@ -5,24 +6,34 @@ from custom_logging.custom_logger import get_logger
 
 clogger = get_logger()
 MODULE_NAME = "PERIODIC_CHECKER_JOB"
+LOG_PREFIX = f"[{MODULE_NAME}]"
 
 
-async def check_and_execute_ready_jobs() -> None:
+async def check_and_execute_ready_jobs() -> int:
+    """Dispatch a batch of ready jobs, returns how many were dispatched"""
     try:
         async with get_db_context() as session:
             job_repo = JobRepository(session)
 
-            pending_jobs = await job_repo.get_jobs_ready_for_execution(limit=3)
+            # rows stay locked until this transaction commits, after they are marked sent
+            pending_jobs = await job_repo.get_jobs_ready_for_execution(
+                limit=CHECK_FOR_JOBS_BATCH_LIMIT
+            )
 
+            dispatched = 0
             if pending_jobs:
                 clogger.info(
-                    f"[{MODULE_NAME}] Found {len(pending_jobs)} (limit=3) pending jobs to execute"
+                    "%s Found %d (limit=%d) pending jobs to execute",
+                    LOG_PREFIX,
+                    len(pending_jobs),
+                    CHECK_FOR_JOBS_BATCH_LIMIT,
                 )
 
-                for job in pending_jobs:
-                    await JobExecutor.execute_job(job)
+                results = await JobExecutor.execute_batch(pending_jobs, session=session)
+                dispatched = sum(results)
+
+        return dispatched
 
     except Exception as e:
-        clogger.error(
-            f"[{MODULE_NAME}] Error checking pending jobs: {e}", exc_info=True
-        )
+        clogger.error("%s Error checking pending jobs: %s", LOG_PREFIX, e, exc_info=True)
+        return 0
@@ -0,0 +1,122 @@
+import asyncio
+import heapq
+import time
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from scheduler.repositories.job_repository import JobRepository
+from scheduler.database.postgres_database import get_db_context
+from custom_logging.custom_logger import get_logger
+
+clogger = get_logger()
+MODULE_NAME = "TIMEOUT_MONITOR"
+LOG_PREFIX = f"[{MODULE_NAME}]"
+
+EXPIRE_RETRY_DELAY_SECONDS = 5
+
+
+class TimeoutMonitor:
+    """
+    Single coroutine that times out sent jobs nobody answered, deadlines are kept in a min-heap
+    of (deadline, job_id, attempts_count) and everything expired is marked in one UPDATE.
+    The attempt is part of the entry so a stale deadline never times out a later retry
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, UUID, int]] = []
+        self._condition: Optional[asyncio.Condition] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task:
+            return
+
+        self._condition = asyncio.Condition()
+        self._task = asyncio.create_task(self._run())
+        await self._arm_sent_jobs()
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def arm(self, job_id: UUID, deadline: float, attempts_count: int) -> None:
+        """Time the attempt out at deadline (unix timestamp) unless a result arrives first"""
+        async with self._condition:
+            heapq.heappush(self._heap, (deadline, job_id, attempts_count))
+            # wake the loop only if the earliest deadline changed
+            if self._heap[0][1] == job_id:
+                self._condition.notify()
+
+    async def _arm_sent_jobs(self) -> None:
+        """Re-arm jobs that were already sent before a restart"""
+        try:
+            async with get_db_context() as session:
+                sent_jobs = await JobRepository(session).get_sent_job_deadlines()
+        except Exception as e:
+            clogger.error("%s Failed to load sent jobs: %s", LOG_PREFIX, e, exc_info=True)
+            return
+
+        for job_id, sent_at, timeout_seconds, attempts_count in sent_jobs:
+            sent_ts = sent_at.timestamp() if sent_at else time.time()
+            await self.arm(job_id, sent_ts + timeout_seconds, attempts_count)
+
+        if sent_jobs:
+            clogger.info("%s Re-armed %d sent jobs", LOG_PREFIX, len(sent_jobs))
+
+    async def _run(self) -> None:
+        while True:
+            async with self._condition:
+                while not self._heap or self._heap[0][0] > time.time():
+                    timeout = self._heap[0][0] - time.time() if self._heap else None
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        pass
+
+                now = time.time()
+                expired = []
+                while self._heap and self._heap[0][0] <= now:
+                    _, job_id, attempts_count = heapq.heappop(self._heap)
+                    expired.append((job_id, attempts_count))
+
+            await self._expire(expired)
+
+    async def _expire(self, expired: List[Tuple[UUID, int]]) -> None:
+        try:
+            async with get_db_context() as session:
+                timed_out = await JobRepository(session).bulk_mark_timeout(expired)
+        except Exception as e:
+            clogger.error(
+                "%s Error timing out %d jobs: %s", LOG_PREFIX, len(expired), e, exc_info=True
+            )
+            retry_at = time.time() + EXPIRE_RETRY_DELAY_SECONDS
+            for job_id, attempts_count in expired:
+                await self.arm(job_id, retry_at, attempts_count)
+            return
+
+        for job in timed_out:
+            clogger.warning(
+                "%s Job %s timed out after %d seconds",
+                LOG_PREFIX,
+                job.job_id,
+                job.timeout_seconds,
+            )
+
+            if job.is_retriable():
+                clogger.info(
+                    "%s Job %s will be retried later by retrier logic (attempt %d/%d)",
+                    LOG_PREFIX,
+                    job.job_id,
+                    job.attempts_count,
+                    job.max_attempts,
+                )
+
+
+timeout_monitor = TimeoutMonitor()
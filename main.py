@@ -6,15 +6,21 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from rabbitmq.rabbitmq_controller import rabbitmq_controller
 from scheduler.config import RABBITMQ_URL, VERSION
-from scheduler.consumers.job_result_consumer import start_job_result_consumer
+from scheduler.consumers.job_result_consumer import (
+    start_job_result_consumer,
+    stop_job_result_consumer,
+)
 from scheduler.database.postgres_database import create_tables
 from scheduler.jobs.check_jobs_initializer import initialize_jobs_checker
 from scheduler.jobs.cleanup_jobs_initializer import initialize_cleanup_jobs
+from scheduler.jobs.job_ready_listener import job_ready_listener
+from scheduler.jobs.timeout_monitor import timeout_monitor
 from scheduler.routers import health_router
 from custom_logging.custom_logger import get_logger
 
 clogger = get_logger()
 MODULE_NAME = "JOB_SCHEDULER_MAIN"
+LOG_PREFIX = f"[{MODULE_NAME}]"
 
 scheduler: AsyncIOScheduler = None
 
@@ -23,32 +29,35 @@ scheduler: AsyncIOScheduler = None
 async def lifespan(app: FastAPI):
     global scheduler
 
-    clogger.info(f"[{MODULE_NAME}] Starting job scheduler microservice")
+    clogger.info("%s Starting job scheduler microservice", LOG_PREFIX)
 
     try:
         await create_tables()
-        clogger.info(f"[{MODULE_NAME}] Database tables created/verified")
+        clogger.info("%s Database tables created/verified", LOG_PREFIX)
     except Exception as e:
         clogger.error(
-            f"[{MODULE_NAME}] Failed to create database tables: {e}", exc_info=True
+            "%s Failed to create database tables: %s", LOG_PREFIX, e, exc_info=True
         )
         raise
 
     try:
         await rabbitmq_controller.connect(RABBITMQ_URL)
-        clogger.info(f"[{MODULE_NAME}] Connected to RabbitMQ")
+        clogger.info("%s Connected to RabbitMQ", LOG_PREFIX)
     except Exception as e:
         clogger.error(
-            f"[{MODULE_NAME}] Failed to connect to RabbitMQ: {e}", exc_info=True
+            "%s Failed to connect to RabbitMQ: %s", LOG_PREFIX, e, exc_info=True
         )
         raise
 
+    await timeout_monitor.start()
+    clogger.info("%s Job timeout monitor started", LOG_PREFIX)
+
     try:
         consumer_task = asyncio.create_task(start_job_result_consumer())
-        clogger.info(f"[{MODULE_NAME}] RabbitMQ consumer started")
+        clogger.info("%s RabbitMQ consumer started", LOG_PREFIX)
     except Exception as e:
         clogger.error(
-            f"[{MODULE_NAME}] Failed to start RabbitMQ consumer: {e}", exc_info=True
+            "%s Failed to start RabbitMQ consumer: %s", LOG_PREFIX, e, exc_info=True
         )
         raise
 
@@ -59,35 +68,50 @@ async def lifespan(app: FastAPI):
 
         scheduler.start()
         clogger.info(
-            f"[{MODULE_NAME}] APScheduler started with {len(scheduler.get_jobs())} jobs"
+            "%s APScheduler started with %d jobs", LOG_PREFIX, len(scheduler.get_jobs())
         )
 
         for job in scheduler.get_jobs():
             clogger.info(
-                f"[{MODULE_NAME}] Scheduled job: {job.name} (ID: {job.id}) "
-                f"- Next run: {job.next_run_time}"
+                "%s Scheduled job: %s (ID: %s) - Next run: %s",
+                LOG_PREFIX,
+                job.name,
+                job.id,
+                job.next_run_time,
             )
 
     except Exception as e:
         clogger.error(
-            f"[{MODULE_NAME}] Failed to start APScheduler and initialize jobs: {e}", exc_info=True
+            "%s Failed to start APScheduler and initialize jobs: %s",
+            LOG_PREFIX,
+            e,
+            exc_info=True,
         )
         raise
 
-    clogger.info(f"[{MODULE_NAME}] Job scheduler microservice fully started")
+    job_ready_listener.start()
+    clogger.info("%s Job ready listener started", LOG_PREFIX)
+
+    clogger.info("%s Job scheduler microservice fully started", LOG_PREFIX)
 
     yield
 
-    clogger.info(f"[{MODULE_NAME}] Shutting down job scheduler microservice")
+    clogger.info("%s Shutting down job scheduler microservice", LOG_PREFIX)
+
+    await job_ready_listener.stop()
 
     if scheduler and scheduler.running:
         scheduler.shutdown()
-        clogger.info(f"[{MODULE_NAME}] APScheduler shut down")
+        clogger.info("%s APScheduler shut down", LOG_PREFIX)
+
+    await stop_job_result_consumer()
+    await timeout_monitor.stop()
 
     await rabbitmq_controller.disconnect()
-    clogger.info(f"[{MODULE_NAME}] RabbitMQ disconnected")
+    clogger.info("%s RabbitMQ disconnected", LOG_PREFIX)
 
-    clogger.info(f"[{MODULE_NAME}] Shutdown complete")
+    clogger.info("%s Shutdown complete", LOG_PREFIX)
+    clogger.shutdown()
 
 
 app = FastAPI(
@@ -4,11 +4,16 @@ from datetime import datetime
 from typing import Any, Dict, Optional
 
 from sqlalchemy import (
+    DDL,
     String,
     DateTime,
     Integer,
     Enum as SAEnum,
+    Index,
     Text,
+    event,
+    func,
+    text,
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column
@@ -16,6 +21,9 @@ from sqlalchemy.orm import Mapped, mapped_column
 from scheduler.database.postgres_database import Base
 from utils.timezone_utils import now_utc
 
+# postgres channel notified whenever a job becomes ready right away (see trigger below)
+JOB_READY_NOTIFY_CHANNEL = "job_ready"
+
 
 class JobTypeEnum(str, enum.Enum):
     MFA_EXPIRY_CLEANUP = "mfa_expiry_cleanup"
@@ -39,11 +47,39 @@ class JobStatusEnum(str, enum.Enum):
 
 class Job(Base):
     __tablename__ = "jobs"
+    # read server defaults (job_id, created_at) back through INSERT ... RETURNING
+    __mapper_args__ = {"eager_defaults": True}
+    # partial indexes only hold the rows each hot query looks at, so they stay small
+    # however much finished job history piles up. Queries meant to use them render the
+    # status as a literal (_status_literal in the repository), so every plan can match them
+    __table_args__ = (
+        Index(
+            "ix_jobs_pending_scheduled",
+            "scheduled_for",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+        Index(
+            "ix_jobs_retry",
+            "next_retry_at",
+            postgresql_where=text(
+                "status IN ('FAILED', 'TIMEOUT') AND attempts_count < max_attempts"
+            ),
+        ),
+        # covers the timeout monitor's startup scan, answered from the index alone
+        Index(
+            "ix_jobs_sent_covering",
+            "sent_at",
+            postgresql_include=["job_id", "timeout_seconds", "attempts_count"],
+            postgresql_where=text("status = 'SENT'"),
+        ),
+        # get_recent_jobs, ORDER BY created_at DESC LIMIT n scans it backwards
+        Index("ix_jobs_created_at", "created_at"),
+    )
 
     job_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
     )
 
     job_type: Mapped[JobTypeEnum] = mapped_column(
@@ -56,7 +92,6 @@ class Job(Base):
         SAEnum(JobStatusEnum),
         nullable=False,
         default=JobStatusEnum.PENDING,
-        index=True,
     )
 
     scheduled_for: Mapped[datetime] = mapped_column(
@@ -75,6 +110,12 @@ class Job(Base):
         nullable=True,
     )
 
+    # set when an attempt fails or times out, min_retry_delay_seconds later
+    next_retry_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
     timeout_seconds: Mapped[int] = mapped_column(
         Integer,
         nullable=False,
@@ -118,7 +159,7 @@ class Job(Base):
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        default=now_utc,
+        server_default=func.now(),
         nullable=False,
     )
 
@@ -139,22 +180,71 @@ class Job(Base):
             and self.attempts_count < self.max_attempts
         )
 
-    def mark_sent(self) -> None:
-        self.status = JobStatusEnum.SENT
-        self.sent_at = now_utc()
-        self.attempts_count += 1
-
-    def mark_completed(
-        self, result: Optional[Dict[str, Any]] = None, duration_ms: Optional[int] = None
-    ) -> None:
-        self.status = JobStatusEnum.COMPLETED
-        self.completed_at = now_utc()
-        self.result = result
-        self.execution_duration_ms = duration_ms
-
-    def mark_failed(self, error_message: str) -> None:
-        self.status = JobStatusEnum.FAILED
-        self.error_message = error_message
-
-    def mark_timeout(self) -> None:
-        self.status = JobStatusEnum.TIMEOUT
+
+# runs after every create_all, all statements are idempotent so existing databases get them too.
+# statuses are stored by enum name, and pg_notify collapses identical payloads within a transaction
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        """
+        ALTER TABLE jobs
+            ALTER COLUMN job_id SET DEFAULT gen_random_uuid(),
+            ALTER COLUMN created_at SET DEFAULT now()
+        """
+    ),
+)
+# next_retry_at was added later. One-off migration, only a database created before it
+# gets the column and the backfill for jobs already waiting on a retry
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_schema = current_schema()
+                    AND table_name = 'jobs'
+                    AND column_name = 'next_retry_at'
+            ) THEN
+                ALTER TABLE jobs ADD COLUMN next_retry_at TIMESTAMP WITH TIME ZONE;
+                UPDATE jobs
+                SET next_retry_at = updated_at + min_retry_delay_seconds * interval '1 second'
+                WHERE status IN ('FAILED', 'TIMEOUT');
+            END IF;
+        END
+        $$
+        """
+    ),
+)
+# superseded by the partial indexes above
+event.listen(Base.metadata, "after_create", DDL("DROP INDEX IF EXISTS ix_jobs_status"))
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        f"""
+        CREATE OR REPLACE FUNCTION notify_job_ready() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.status = 'PENDING' AND NEW.scheduled_for <= now() THEN
+                PERFORM pg_notify('{JOB_READY_NOTIFY_CHANNEL}', '');
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    ),
+)
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        """
+        CREATE OR REPLACE TRIGGER jobs_notify_job_ready
+        AFTER INSERT OR UPDATE OF status, scheduled_for ON jobs
+        FOR EACH ROW EXECUTE FUNCTION notify_job_ready()
+        """
+    ),
+)
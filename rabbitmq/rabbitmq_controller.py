@@ -1,6 +1,8 @@
 import asyncio
-import json
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+import msgspec
+import orjson
 from aio_pika import (
     connect_robust,
     Message,
@@ -11,103 +13,387 @@ from aio_pika import (
     Queue,
 )
 from aio_pika.abc import AbstractIncomingMessage
-from scheduler.config import RABBITMQ_EXCHANGE
+from aio_pika.exceptions import ChannelInvalidStateError
+from aio_pika.pool import Pool
+from aiormq.abc import AbstractChannel
+from pydantic import BaseModel
+from scheduler.config import (
+    ACK_BATCH_SIZE,
+    ACK_FLUSH_MS,
+    RABBITMQ_EXCHANGE,
+    RABBITMQ_PREFETCH,
+    RABBITMQ_PUBLISH_FORMAT,
+    RABBITMQ_PUBLISHER_CHANNELS,
+)
 from custom_logging.custom_logger import get_logger
 
 clogger = get_logger()
 MODULE_NAME = "RabbitMQController"
+LOG_PREFIX = f"[{MODULE_NAME}]"
 
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+CONTENT_TYPES = {"json": JSON_CONTENT_TYPE, "msgpack": MSGPACK_CONTENT_TYPE}
 
-class RabbitMQController:
-    _instance: Optional["RabbitMQController"] = None
-    _lock = asyncio.Lock()
+# built once, they keep their type and buffer state between calls
+_MSGPACK_ENCODER = msgspec.msgpack.Encoder()
+_MSGPACK_DECODER = msgspec.msgpack.Decoder()
+
+# how long a publish waits for an in-progress (re)connect before giving up
+PUBLISH_READY_TIMEOUT_SECONDS = 5
+
+# dict messages estimated above this size are encoded on a worker thread
+ENCODE_OFFLOAD_BYTES = 64 * 1024
+
+
+def _exceeds_size(value: Any, limit: int) -> bool:
+    """
+    Rough encoded size check, walks the message only until the limit is passed
+    so the cost stays bounded however large the message is
+    """
+    remaining = limit
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, (str, bytes)):
+            remaining -= len(item) + 2
+        elif isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+            remaining -= 2
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+            remaining -= 2
+        else:
+            remaining -= 8
+        if remaining < 0:
+            return True
+    return False
+
+
+class UnprocessableMessageError(Exception):
+    """Raised by a consume callback to reject its message without requeue"""
+
+
+# (channel, delivery tag), tags are only unique within the channel that delivered them
+_DeliveryKey = Tuple[AbstractChannel, int]
+
+
+class _AckBatcher:
+    """
+    Acknowledges processed deliveries of one consumer in batches
+    (single basic.ack with multiple=True every batch_size messages or flush_interval_ms).
+    Deliveries are kept per channel: delivery tags restart on the channel a reconnect
+    opens, and deliveries of the closed one can no longer be acked
+    """
+
+    def __init__(self, queue_name: str, batch_size: int, flush_interval_ms: int):
+        self._queue_name = queue_name
+        self._batch_size = max(batch_size, 1)
+        self._flush_interval = flush_interval_ms / 1000
+        self._lock = asyncio.Lock()
+        self._in_flight: Set[_DeliveryKey] = set()
+        self._processed: List[Tuple[_DeliveryKey, AbstractIncomingMessage]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        async with self._lock:
+            await self._flush()
+
+    def track(self, message: AbstractIncomingMessage) -> Optional[_DeliveryKey]:
+        """Returns the key to pass on for the message, None if its channel is already closed"""
+        try:
+            key = (message.channel, message.delivery_tag)
+        except ChannelInvalidStateError:
+            return None
+        self._in_flight.add(key)
+        return key
+
+    def untrack(self, key: Optional[_DeliveryKey]) -> None:
+        self._in_flight.discard(key)
+
+    async def add_processed(
+        self, key: Optional[_DeliveryKey], message: AbstractIncomingMessage
+    ) -> None:
+        if key is None:
+            return
+
+        async with self._lock:
+            self._in_flight.discard(key)
+            self._processed.append((key, message))
+            if len(self._processed) >= self._batch_size:
+                await self._flush()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            async with self._lock:
+                await self._flush()
+
+    async def _flush(self) -> None:
+        # the broker redelivers whatever was unacked on a closed channel
+        self._processed = [
+            (key, message) for key, message in self._processed if not key[0].is_closed
+        ]
+        self._in_flight = {key for key in self._in_flight if not key[0].is_closed}
+
+        for channel in {key[0] for key, _ in self._processed}:
+            # multiple=True acks every earlier delivery too, so stop below the oldest one still being processed
+            in_flight = [tag for ch, tag in self._in_flight if ch is channel]
+            oldest_in_flight = min(in_flight) if in_flight else None
+            ackable = [
+                (tag, message)
+                for (ch, tag), message in self._processed
+                if ch is channel
+                and (oldest_in_flight is None or tag < oldest_in_flight)
+            ]
+            if not ackable:
+                continue
+
+            last_tag, last = max(ackable, key=lambda item: item[0])
+            # dropped before the ack is sent, a cancel landing after the frame went out
+            # must not leave the tags behind for another flush to ack a second time
+            acked = [
+                ((ch, tag), message)
+                for (ch, tag), message in self._processed
+                if ch is channel and tag <= last_tag
+            ]
+            self._processed = [
+                ((ch, tag), message)
+                for (ch, tag), message in self._processed
+                if ch is not channel or tag > last_tag
+            ]
+            try:
+                await last.ack(multiple=True)
+            except Exception as e:
+                # kept and retried on the next flush, or dropped once the channel is closed
+                self._processed.extend(acked)
+                clogger.error(
+                    "%s Failed to ack batch for queue '%s': %s",
+                    LOG_PREFIX,
+                    self._queue_name,
+                    e,
+                )
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
 
+class RabbitMQController:
     def __init__(self):
-        if not hasattr(self, "_initialized"):
-            self._connection: Optional[Connection] = None
-            self._channel: Optional[Channel] = None
-            self._exchange: Optional[Exchange] = None
-            self._rabbitmq_url: Optional[str] = None
-            self._exchange_name: str = RABBITMQ_EXCHANGE
-            self._initialized = True
-
-    async def connect(self, rabbitmq_url: str) -> None:
+        # serializes connect and disconnect
+        self._lock = asyncio.Lock()
+        self._connection: Optional[Connection] = None
+        # a pool of confirm-enabled channels for publishes
+        self._publisher_pool: Optional[Pool[Channel]] = None
+        # declares the exchange, every consumer gets a channel of its own
+        self._channel: Optional[Channel] = None
+        self._exchange: Optional[Exchange] = None
+        self._rabbitmq_url: Optional[str] = None
+        self._exchange_name: str = RABBITMQ_EXCHANGE
+        self._content_type: str = CONTENT_TYPES[RABBITMQ_PUBLISH_FORMAT]
+        self._prefetch_count: int = RABBITMQ_PREFETCH
+        self._ack_batchers: list[_AckBatcher] = []
+        # queue name -> (queue, consumer tag) of every active consumer
+        self._consumers: Dict[str, Tuple[Queue, str]] = {}
+        # created on first connect, inside the running loop
+        self._ready: Optional[asyncio.Event] = None
+
+    async def connect(
+        self, rabbitmq_url: str, prefetch_count: int = RABBITMQ_PREFETCH
+    ) -> None:
+        """
+        prefetch_count is the default number of unacked deliveries per consumer,
+        keep it at least the ack batch size so a full batch can be in flight
+        """
         async with self._lock:
             if self._connection and not self._connection.is_closed:
-                clogger.info(f"[{MODULE_NAME}] Already connected to RabbitMQ")
+                clogger.info("%s Already connected to RabbitMQ", LOG_PREFIX)
                 return
 
             try:
                 self._rabbitmq_url = rabbitmq_url
                 self._connection = await connect_robust(rabbitmq_url)
+                # channels live as long as the connection, the robust connection
+                # reopens them (with qos, exchange and consumers) after a reconnect
                 self._channel = await self._connection.channel()
-                await self._channel.set_qos(prefetch_count=10)
+                self._prefetch_count = prefetch_count
 
                 self._exchange = await self._channel.declare_exchange(
                     self._exchange_name, ExchangeType.TOPIC, durable=True
                 )
 
-                clogger.info(f"[{MODULE_NAME}] Connected to RabbitMQ at {rabbitmq_url}")
+                # publisher channels are opened on first use, up to the pool size
+                self._publisher_pool = Pool(
+                    self._open_publisher_channel, max_size=RABBITMQ_PUBLISHER_CHANNELS
+                )
+                self._ready_event().set()
+
+                clogger.info("%s Connected to RabbitMQ at %s", LOG_PREFIX, rabbitmq_url)
             except Exception as e:
-                clogger.error(f"[{MODULE_NAME}] Failed to connect to RabbitMQ: {e}")
+                clogger.error("%s Failed to connect to RabbitMQ: %s", LOG_PREFIX, e)
                 raise
 
     async def disconnect(self) -> None:
         async with self._lock:
+            self._ready_event().clear()
+            for ack_batcher in self._ack_batchers:
+                await ack_batcher.stop()
+            self._ack_batchers = []
+            self._consumers = {}
+
+            if self._publisher_pool:
+                await self._publisher_pool.close()
+
             if self._connection and not self._connection.is_closed:
                 try:
                     await self._connection.close()
-                    clogger.info(f"[{MODULE_NAME}] Disconnected from RabbitMQ")
+                    clogger.info("%s Disconnected from RabbitMQ", LOG_PREFIX)
                 except Exception as e:
                     clogger.error(
-                        f"[{MODULE_NAME}] Error disconnecting from RabbitMQ: {e}"
+                        "%s Error disconnecting from RabbitMQ: %s", LOG_PREFIX, e
                     )
             self._connection = None
+            self._publisher_pool = None
             self._channel = None
             self._exchange = None
 
+    def _ready_event(self) -> asyncio.Event:
+        if self._ready is None:
+            self._ready = asyncio.Event()
+        return self._ready
+
+    async def _open_publisher_channel(self) -> Channel:
+        # confirms are enabled once per channel, each publish then awaits only its own confirm
+        return await self._connection.channel(publisher_confirms=True)
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        """Encode a message body in the configured publish format"""
+        if self._content_type == MSGPACK_CONTENT_TYPE:
+            return _MSGPACK_ENCODER.encode(message)
+        # orjson emits bytes and handles UUID / datetime values natively
+        return orjson.dumps(message, option=orjson.OPT_UTC_Z)
+
+    def encode_event(self, event: BaseModel) -> bytes:
+        """Encode an event model in the configured publish format"""
+        if self._content_type == MSGPACK_CONTENT_TYPE:
+            return _MSGPACK_ENCODER.encode(event.model_dump())
+        # pydantic-core writes the JSON bytes straight from the model, no intermediate dict
+        return event.__pydantic_serializer__.to_json(event)
+
+    async def encode_event_offloaded(self, event: BaseModel) -> bytes:
+        """encode_event, on a worker thread when the event's fields are estimated large"""
+        # same rule publish applies to dict messages
+        if _exceeds_size(event.__dict__, ENCODE_OFFLOAD_BYTES):
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self.encode_event, event
+            )
+        return self.encode_event(event)
+
     async def publish(
         self,
         routing_key: Optional[str] = None,
-        message: Optional[Dict[str, str]] = None,
+        message: Optional[Union[Dict[str, Any], bytes]] = None,
+        persistent: bool = True,
+    ) -> bool:
+        """Publish a dict, or a body already produced by encode(), in the configured format"""
+        results = await self.publish_many(
+            [(routing_key, message)], persistent=persistent
+        )
+        return results[0]
+
+    async def publish_many(
+        self,
+        items: List[Tuple[Optional[str], Optional[Union[Dict[str, Any], bytes]]]],
         persistent: bool = True,
+    ) -> List[bool]:
+        """
+        Publish (routing_key, message) pairs back to back on one pooled confirm channel and
+        await all confirms together, returns per-item success in order
+        """
+        ready = self._ready_event()
+        if not ready.is_set():
+            try:
+                await asyncio.wait_for(
+                    ready.wait(), timeout=PUBLISH_READY_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                clogger.error(
+                    "%s Not connected to RabbitMQ, cannot publish.", LOG_PREFIX
+                )
+                return [False] * len(items)
+
+        try:
+            async with self._publisher_pool.acquire() as channel:
+                # a local handle to the exchange declared on connect, no round trip
+                exchange = await channel.get_exchange(self._exchange_name, ensure=False)
+                return list(
+                    await asyncio.gather(
+                        *(
+                            self._publish_on(exchange, routing_key, message, persistent)
+                            for routing_key, message in items
+                        )
+                    )
+                )
+        except Exception as e:
+            clogger.error(
+                "%s Failed to get a publisher channel: %s", LOG_PREFIX, e, exc_info=True
+            )
+            return [False] * len(items)
+
+    async def _publish_on(
+        self,
+        exchange: Exchange,
+        routing_key: Optional[str],
+        message: Optional[Union[Dict[str, Any], bytes]],
+        persistent: bool,
     ) -> bool:
         try:
             if not routing_key:
                 clogger.error(
-                    f"[{MODULE_NAME}] Bad argument (routing_key) passed for publishing, cannot publish."
+                    "%s Bad argument (routing_key) passed for publishing, cannot publish.",
+                    LOG_PREFIX,
                 )
                 return False
             if not message:
                 clogger.error(
-                    f"[{MODULE_NAME}] Bad argument (message) passed for publishing, cannot publish."
-                )
-                return False
-            if not self._exchange:
-                clogger.error(
-                    f"[{MODULE_NAME}] Not connected to RabbitMQ, cannot publish."
+                    "%s Bad argument (message) passed for publishing, cannot publish.",
+                    LOG_PREFIX,
                 )
                 return False
 
-            message_body = json.dumps(message).encode()
+            if isinstance(message, bytes):
+                message_body = message
+            elif _exceeds_size(message, ENCODE_OFFLOAD_BYTES):
+                # keep the loop responsive while a large body is encoded
+                message_body = await asyncio.get_running_loop().run_in_executor(
+                    None, self.encode, message
+                )
+            else:
+                message_body = self.encode(message)
             aio_message = Message(
                 body=message_body,
-                content_type="application/json",
+                content_type=self._content_type,
                 delivery_mode=2 if persistent else 1,
             )
 
-            await self._exchange.publish(aio_message, routing_key=routing_key)
+            await exchange.publish(aio_message, routing_key=routing_key)
 
-            clogger.info(f"[{MODULE_NAME}] Published message to {routing_key}")
+            clogger.info("%s Published message to %s", LOG_PREFIX, routing_key)
             return True
         except Exception as e:
             clogger.error(
-                f"[{MODULE_NAME}] Failed to publish message to {routing_key}: {e}",
+                "%s Failed to publish message to %s: %s",
+                LOG_PREFIX,
+                routing_key,
+                e,
                 exc_info=True,
             )
             return False
@@ -116,48 +402,128 @@ class RabbitMQController:
         self,
         queue_name: str,
         routing_keys: list[str],
-        callback: Callable[[dict], asyncio.coroutine],
+        callback: Callable[[Union[dict, bytes]], Awaitable[None]],
         auto_ack: bool = False,
+        prefetch_count: Optional[int] = None,
+        ack_batch_size: int = ACK_BATCH_SIZE,
+        ack_flush_ms: int = ACK_FLUSH_MS,
+        decode_json: bool = True,
     ) -> None:
+        """
+        Consume queue_name on a channel of its own, prefetch_count overrides the connection
+        default. Without auto_ack, processed deliveries are acked together every
+        ack_batch_size messages or ack_flush_ms, a channel per consumer keeps those
+        multiple=True acks from covering another consumer's deliveries.
+        With decode_json=False JSON bodies reach the callback as raw bytes, for callbacks
+        that parse and validate them in one pass (msgpack bodies are always decoded)
+        """
         if not self._channel or not self._exchange:
             raise RuntimeError(f"[{MODULE_NAME}] Not connected to RabbitMQ")
 
         try:
-            queue: Queue = await self._channel.declare_queue(queue_name, durable=True)
+            effective_prefetch = (
+                self._prefetch_count if prefetch_count is None else prefetch_count
+            )
+            # qos is per channel state that the robust channel restores after a reconnect
+            channel = await self._connection.channel()
+            await channel.set_qos(prefetch_count=effective_prefetch)
+
+            # 0 means unlimited
+            if not auto_ack and 0 < effective_prefetch < ack_batch_size:
+                clogger.warning(
+                    "%s Prefetch %d for queue '%s' is below the ack batch size %d, "
+                    "acks will only go out on the flush interval",
+                    LOG_PREFIX,
+                    effective_prefetch,
+                    queue_name,
+                    ack_batch_size,
+                )
+
+            queue: Queue = await channel.declare_queue(queue_name, durable=True)
 
             for routing_key in routing_keys:
-                await queue.bind(self._exchange, routing_key=routing_key)
+                await queue.bind(self._exchange_name, routing_key=routing_key)
                 clogger.info(
-                    f"[{MODULE_NAME}] Bound queue '{queue_name}' to routing key '{routing_key}'"
+                    "%s Bound queue '%s' to routing key '%s'",
+                    LOG_PREFIX,
+                    queue_name,
+                    routing_key,
                 )
 
+            ack_batcher: Optional[_AckBatcher] = None
+            if not auto_ack:
+                ack_batcher = _AckBatcher(queue_name, ack_batch_size, ack_flush_ms)
+                ack_batcher.start()
+                self._ack_batchers.append(ack_batcher)
+
             async def _on_message(message: AbstractIncomingMessage) -> None:
+                key = ack_batcher.track(message) if ack_batcher else None
                 try:
-                    body = json.loads(message.body.decode())
+                    # peers may publish either format, anything not msgpack is JSON
+                    if message.content_type == MSGPACK_CONTENT_TYPE:
+                        body = _MSGPACK_DECODER.decode(message.body)
+                    elif decode_json:
+                        body = orjson.loads(message.body)
+                    else:
+                        body = message.body
                     clogger.info(
-                        f"[{MODULE_NAME}] Received message from queue '{queue_name}': {body.get('event_type', 'unknown')}"
+                        "%s Received message from queue '%s': %s",
+                        LOG_PREFIX,
+                        queue_name,
+                        message.routing_key,
                     )
 
                     await callback(body)
 
-                    if not auto_ack:
-                        await message.ack()
-                except json.JSONDecodeError as e:
-                    clogger.error(f"[{MODULE_NAME}] Failed to decode message: {e}")
+                    if ack_batcher:
+                        await ack_batcher.add_processed(key, message)
+                except (orjson.JSONDecodeError, msgspec.DecodeError) as e:
+                    clogger.error("%s Failed to decode message: %s", LOG_PREFIX, e)
+                    await message.reject(requeue=False)
+                except UnprocessableMessageError as e:
+                    clogger.error("%s Rejected message: %s", LOG_PREFIX, e)
                     await message.reject(requeue=False)
                 except Exception as e:
-                    clogger.error(f"[{MODULE_NAME}] Error processing message: {e}")
+                    clogger.error("%s Error processing message: %s", LOG_PREFIX, e)
                     await message.reject(requeue=True)
+                finally:
+                    if ack_batcher:
+                        ack_batcher.untrack(key)
 
-            await queue.consume(_on_message, no_ack=auto_ack)
-            clogger.info(f"[{MODULE_NAME}] Consuming from queue '{queue_name}'")
+            consumer_tag = await queue.consume(_on_message, no_ack=auto_ack)
+            self._consumers[queue_name] = (queue, consumer_tag)
+            clogger.info("%s Consuming from queue '%s'", LOG_PREFIX, queue_name)
 
         except Exception as e:
             clogger.error(
-                f"[{MODULE_NAME}] Failed to setup consumer for queue '{queue_name}': {e}"
+                "%s Failed to setup consumer for queue '%s': %s",
+                LOG_PREFIX,
+                queue_name,
+                e,
             )
             raise
 
+    async def cancel(self, queue_name: str) -> None:
+        """
+        Stop the broker from delivering queue_name to this consumer, deliveries already
+        received are still processed and acked
+        """
+        consumer = self._consumers.pop(queue_name, None)
+        if not consumer:
+            return
+
+        queue, consumer_tag = consumer
+        try:
+            await queue.cancel(consumer_tag)
+            clogger.info("%s Stopped consuming from queue '%s'", LOG_PREFIX, queue_name)
+        except Exception as e:
+            clogger.error(
+                "%s Failed to cancel consumer for queue '%s': %s",
+                LOG_PREFIX,
+                queue_name,
+                e,
+            )
+
 
 # singleton instance
 rabbitmq_controller = RabbitMQController()
@@ -1,8 +1,22 @@
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 from uuid import UUID
 from datetime import datetime, timedelta
 
-from sqlalchemy import select, update
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Integer,
+    Table,
+    bindparam,
+    cast,
+    column,
+    insert,
+    literal,
+    select,
+    tuple_,
+    update,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from scheduler.models.job import Job, JobStatusEnum, JobTypeEnum
@@ -10,53 +24,89 @@ from utils.timezone_utils import now_utc
 
 from sqlalchemy import or_, and_
 
+# statuses a job can be (re)sent from
+DISPATCHABLE_STATUSES = [JobStatusEnum.PENDING, JobStatusEnum.FAILED, JobStatusEnum.TIMEOUT]
+# statuses a job waits in for its next attempt
+RETRYABLE_STATUSES = [JobStatusEnum.FAILED, JobStatusEnum.TIMEOUT]
+
+
+def _next_retry_at(jobs: Table, now: datetime) -> ColumnElement:
+    # evaluated per row inside the UPDATE, each job has its own retry delay.
+    # now is bound as timestamptz, a plain bind would be sent as a naive timestamp
+    return literal(now, DateTime(timezone=True)) + jobs.c.min_retry_delay_seconds * timedelta(
+        seconds=1
+    )
+
+
+def _status_literal(status: JobStatusEnum) -> ColumnElement:
+    # rendered into the SQL text instead of bound. The partial indexes have literal status
+    # predicates, and a generic plan of the cached prepared statement cannot prove them
+    # from a bound status, so it would scan the whole job history instead
+    return literal(status, Job.status.type, literal_execute=True)
+
+
+# built once, every poll only binds now and limit
+_READY_JOBS_STATEMENT = (
+    select(Job)
+    .where(
+        # both branches compare plain columns, so they range scan their partial index
+        or_(
+            and_(
+                Job.status == _status_literal(JobStatusEnum.PENDING),
+                Job.scheduled_for <= bindparam("now"),
+            ),
+            and_(
+                Job.status.in_([_status_literal(s) for s in RETRYABLE_STATUSES]),
+                Job.attempts_count < Job.max_attempts,
+                Job.next_retry_at <= bindparam("now"),
+            ),
+        )
+    )
+    .order_by(Job.scheduled_for)
+    .limit(bindparam("limit", type_=Integer))
+    .with_for_update(skip_locked=True)
+)
+
 
 class JobRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def create(self, job: Job) -> Job:
+        # server generated columns come back on the INSERT itself (eager_defaults on Job)
         self.session.add(job)
         await self.session.flush()
-        await self.session.refresh(job)
         return job
 
+    async def bulk_insert(self, rows: List[Dict[str, Any]]) -> List[Job]:
+        """Multi-row INSERT ... RETURNING, job_id and created_at are generated by postgres"""
+        if not rows:
+            return []
+
+        result = await self.session.scalars(
+            insert(Job).returning(Job, sort_by_parameter_order=True), rows
+        )
+        return list(result.all())
+
     async def get_by_id(self, job_id: UUID) -> Optional[Job]:
         result = await self.session.execute(select(Job).where(Job.job_id == job_id))
         return result.scalar_one_or_none()
 
     async def get_jobs_ready_for_execution(self, limit: int = 100) -> List[Job]:
-        now = now_utc()
-
+        """
+        Ready jobs are row-locked until the session's transaction ends, rows already locked
+        by another checker are skipped, so concurrent checkers never pick the same job.
+        Mark them sent (bulk_mark_sent) in that same transaction, so they have left the
+        ready set by the time the locks are released
+        """
         result = await self.session.execute(
-            select(Job)
-            .where(
-                or_(
-                    and_(Job.status == JobStatusEnum.PENDING, Job.scheduled_for <= now),
-                    and_(
-                        Job.status == JobStatusEnum.FAILED,
-                        Job.attempts_count < Job.max_attempts,
-                        Job.updated_at
-                        + Job.min_retry_delay_seconds * timedelta(seconds=1)
-                        <= now,
-                    ),
-                    and_(
-                        Job.status == JobStatusEnum.TIMEOUT,
-                        Job.attempts_count < Job.max_attempts,
-                        Job.updated_at
-                        + Job.min_retry_delay_seconds * timedelta(seconds=1)
-                        <= now,
-                    ),
-                )
-            )
-            .order_by(Job.scheduled_for)
-            .limit(limit)
+            _READY_JOBS_STATEMENT, {"now": now_utc(), "limit": limit}
         )
         return list(result.scalars().all())
 
     async def get_sent_jobs_pending_response(self) -> List[Job]:
         result = await self.session.execute(
-            select(Job).where(Job.status == JobStatusEnum.SENT)
+            select(Job).where(Job.status == _status_literal(JobStatusEnum.SENT))
         )
         return list(result.scalars().all())
 
@@ -66,19 +116,65 @@ class JobRepository:
         )
         return list(result.scalars().all())
 
+    async def get_sent_job_deadlines(self) -> List[Tuple[UUID, datetime, int, int]]:
+        """
+        (job_id, sent_at, timeout_seconds, attempts_count) of every sent job,
+        an index-only scan of ix_jobs_sent_covering
+        """
+        result = await self.session.execute(
+            select(
+                Job.job_id, Job.sent_at, Job.timeout_seconds, Job.attempts_count
+            ).where(Job.status == _status_literal(JobStatusEnum.SENT))
+        )
+        return [tuple(row) for row in result.all()]
+
     async def update_job(self, job: Job) -> Job:
-        await self.session.merge(job)
+        merged = await self.session.merge(job)
         await self.session.flush()
-        await self.session.refresh(job)
-        return job
+        return merged
 
     async def mark_sent(self, job_id: UUID) -> Optional[Job]:
-        """Mark job as sent"""
-        job = await self.get_by_id(job_id)
-        if job:
-            job.mark_sent()
-            await self.update_job(job)
-        return job
+        """Mark job as sent in one UPDATE ... RETURNING, jobs that already completed are left alone"""
+        now = now_utc()
+        result = await self.session.execute(
+            update(Job)
+            .where(Job.job_id == job_id, Job.status.in_(DISPATCHABLE_STATUSES))
+            .values(
+                status=JobStatusEnum.SENT,
+                sent_at=now,
+                attempts_count=Job.attempts_count + 1,
+                updated_at=now,
+            )
+            .returning(Job)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def bulk_mark_sent(self, job_ids: List[UUID]) -> Dict[UUID, int]:
+        """
+        Mark many jobs as sent in one UPDATE, jobs that already completed are left alone.
+        Returns the new attempts_count of every job that was marked
+        """
+        if not job_ids:
+            return {}
+
+        now = now_utc()
+        result = await self.session.execute(
+            update(Job)
+            .where(
+                Job.job_id.in_(job_ids),
+                Job.status.in_(DISPATCHABLE_STATUSES),
+            )
+            .values(
+                status=JobStatusEnum.SENT,
+                sent_at=now,
+                attempts_count=Job.attempts_count + 1,
+                updated_at=now,
+            )
+            .returning(Job.job_id, Job.attempts_count)
+            .execution_options(synchronize_session=False)
+        )
+        return {job_id: attempts_count for job_id, attempts_count in result.all()}
 
     async def mark_completed(
         self,
@@ -86,22 +182,137 @@ class JobRepository:
         result: Optional[Dict[str, Any]] = None,
         duration_ms: Optional[int] = None,
     ) -> Optional[Job]:
-        job = await self.get_by_id(job_id)
-        if job:
-            job.mark_completed(result=result, duration_ms=duration_ms)
-            await self.update_job(job)
-        return job
+        now = now_utc()
+        return await self._update_returning(
+            job_id,
+            status=JobStatusEnum.COMPLETED,
+            completed_at=now,
+            result=result,
+            execution_duration_ms=duration_ms,
+            updated_at=now,
+        )
 
     async def mark_failed(self, job_id: UUID, error_message: str) -> Optional[Job]:
-        job = await self.get_by_id(job_id)
-        if job:
-            job.mark_failed(error_message)
-            await self.update_job(job)
-        return job
+        now = now_utc()
+        return await self._update_returning(
+            job_id,
+            status=JobStatusEnum.FAILED,
+            error_message=error_message,
+            next_retry_at=_next_retry_at(Job.__table__, now),
+            updated_at=now,
+        )
 
     async def mark_timeout(self, job_id: UUID) -> Optional[Job]:
-        job = await self.get_by_id(job_id)
-        if job:
-            job.mark_timeout()
-            await self.update_job(job)
-        return job
+        now = now_utc()
+        return await self._update_returning(
+            job_id,
+            status=JobStatusEnum.TIMEOUT,
+            next_retry_at=_next_retry_at(Job.__table__, now),
+            updated_at=now,
+        )
+
+    async def _update_returning(self, job_id: UUID, **values: Any) -> Optional[Job]:
+        """
+        Apply a state transition in one UPDATE ... RETURNING, None if the job does not exist.
+        populate_existing refreshes a Job already loaded in the session from the returned row
+        """
+        result = await self.session.execute(
+            update(Job)
+            .where(Job.job_id == job_id)
+            .values(**values)
+            .returning(Job)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def bulk_mark_completed(
+        self, rows: List[Tuple[UUID, Optional[Dict[str, Any]], Optional[int]]]
+    ) -> List[UUID]:
+        """
+        Mark many jobs as completed in one UPDATE ... FROM (VALUES ...), rows are
+        (job_id, result, duration_ms). Returns the ids of the jobs that were updated
+        """
+        if not rows:
+            return []
+
+        jobs = Job.__table__
+        now = now_utc()
+        # a NULL bind is rendered untyped, a VALUES column that is NULL in every row comes
+        # out as text, so the columns are cast back to the jobs column types where used
+        results = values(
+            column("job_id", jobs.c.job_id.type),
+            column("result", jobs.c.result.type),
+            column("duration_ms", jobs.c.execution_duration_ms.type),
+            name="results",
+        ).data(rows)
+        updated = await self.session.execute(
+            update(jobs)
+            .where(jobs.c.job_id == cast(results.c.job_id, jobs.c.job_id.type))
+            .values(
+                status=JobStatusEnum.COMPLETED,
+                completed_at=now,
+                result=cast(results.c.result, jobs.c.result.type),
+                execution_duration_ms=cast(
+                    results.c.duration_ms, jobs.c.execution_duration_ms.type
+                ),
+                updated_at=now,
+            )
+            .returning(jobs.c.job_id)
+        )
+        return list(updated.scalars().all())
+
+    async def bulk_mark_failed(self, rows: List[Tuple[UUID, str]]) -> List[UUID]:
+        """
+        Mark many jobs as failed in one UPDATE ... FROM (VALUES ...), rows are
+        (job_id, error_message). Returns the ids of the jobs that were updated
+        """
+        if not rows:
+            return []
+
+        jobs = Job.__table__
+        now = now_utc()
+        failures = values(
+            column("job_id", jobs.c.job_id.type),
+            column("error_message", jobs.c.error_message.type),
+            name="failures",
+        ).data(rows)
+        updated = await self.session.execute(
+            update(jobs)
+            # cast back for the same reason as in bulk_mark_completed
+            .where(jobs.c.job_id == cast(failures.c.job_id, jobs.c.job_id.type))
+            .values(
+                status=JobStatusEnum.FAILED,
+                error_message=cast(
+                    failures.c.error_message, jobs.c.error_message.type
+                ),
+                next_retry_at=_next_retry_at(jobs, now),
+                updated_at=now,
+            )
+            .returning(jobs.c.job_id)
+        )
+        return list(updated.scalars().all())
+
+    async def bulk_mark_timeout(self, attempts: List[Tuple[UUID, int]]) -> List[Job]:
+        """
+        Mark jobs still waiting on the given (job_id, attempts_count) attempt as timed out
+        in one UPDATE, returns the jobs that were marked
+        """
+        if not attempts:
+            return []
+
+        now = now_utc()
+        result = await self.session.execute(
+            update(Job)
+            .where(
+                Job.status == JobStatusEnum.SENT,
+                tuple_(Job.job_id, Job.attempts_count).in_(attempts),
+            )
+            .values(
+                status=JobStatusEnum.TIMEOUT,
+                next_retry_at=_next_retry_at(Job.__table__, now),
+                updated_at=now,
+            )
+            .returning(Job)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        return list(result.scalars().all())
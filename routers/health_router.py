@@ -1,17 +1,22 @@
 from typing import Any, Dict
 from fastapi import APIRouter
-from datetime import datetime, timezone
+from fastapi.responses import ORJSONResponse
 
-router = APIRouter()
+from utils.timezone_utils import now_utc
+
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
 @router.get("/")
 async def health_check():
-    return {
-        "status": "healthy",
-        "service": "job_scheduler",
-        "timestamp": datetime.now(timezone.utc).isoformat()
-    }
+    # returned as a response so fastapi skips jsonable_encoder, orjson serializes the datetime itself
+    return ORJSONResponse(
+        {
+            "status": "healthy",
+            "service": "job_scheduler",
+            "timestamp": now_utc(),
+        }
+    )
 
 
 # @router.get("/scheduler")
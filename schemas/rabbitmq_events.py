@@ -1,10 +1,9 @@
-from datetime import datetime, timezone
-from typing import Any, Dict, Literal, Optional, Union
+from typing import Annotated, Any, Dict, Literal, Optional, Union
 from uuid import UUID
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, TypeAdapter
 from enum import Enum
 
-from utils.timezone_utils import now_utc
+from utils.timezone_utils import UtcDatetime, now_utc
 
 
 class NotificationUserRoleEnum(str, Enum):
@@ -38,14 +37,7 @@ class UserNotificationEventBase(BaseModel):
     user_first_name: str
     user_last_name: str
     user_role: NotificationUserRoleEnum
-    timestamp: datetime = now_utc()
-
-    @field_validator("timestamp")
-    @classmethod
-    def validate_utc_datetime(cls, v: datetime) -> datetime:
-        if v.tzinfo is None:
-            raise ValueError("Datetime must be timezone-aware")
-        return v.astimezone(timezone.utc)
+    timestamp: UtcDatetime = Field(default_factory=now_utc)
 
 
 # auth notification events - aligned with email_utils.py templates
@@ -53,18 +45,11 @@ class UserNotificationEventBase(BaseModel):
 
 class MfaCodeData(BaseModel):
     code: str
-    code_expires_at: datetime
+    code_expires_at: UtcDatetime
     client_ip: Optional[str] = None
     client_location: Optional[str] = None
     client_fingerprint: Optional[str] = None
 
-    @field_validator("code_expires_at")
-    @classmethod
-    def validate_utc_datetime(cls, v: datetime) -> datetime:
-        if v.tzinfo is None:
-            raise ValueError("Datetime must be timezone-aware")
-        return v.astimezone(timezone.utc)
-
 
 class MfaCodeEvent(UserNotificationEventBase):
     event_type: Literal[NotificationEventTypeEnum.MFA_CODE] = (
@@ -75,18 +60,11 @@ class MfaCodeEvent(UserNotificationEventBase):
 
 class PasswordResetCodeData(BaseModel):
     code: str
-    code_expires_at: datetime
+    code_expires_at: UtcDatetime
     client_ip: Optional[str] = None
     client_location: Optional[str] = None
     client_fingerprint: Optional[str] = None
 
-    @field_validator("code_expires_at")
-    @classmethod
-    def validate_utc_datetime(cls, v: datetime) -> datetime:
-        if v.tzinfo is None:
-            raise ValueError("Datetime must be timezone-aware")
-        return v.astimezone(timezone.utc)
-
 
 class PasswordResetCodeEvent(UserNotificationEventBase):
     event_type: Literal[NotificationEventTypeEnum.PASSWORD_RESET_CODE] = (
@@ -109,18 +87,11 @@ class PasswordResetNotificationEvent(UserNotificationEventBase):
 
 
 class LoginNotificationData(BaseModel):
-    login_time: datetime
+    login_time: UtcDatetime
     client_ip: Optional[str] = None
     client_location: Optional[str] = None
     client_fingerprint: Optional[str] = None
 
-    @field_validator("login_time")
-    @classmethod
-    def validate_utc_datetime(cls, v: datetime) -> datetime:
-        if v.tzinfo is None:
-            raise ValueError("Datetime must be timezone-aware")
-        return v.astimezone(timezone.utc)
-
 
 class LoginNotificationEvent(UserNotificationEventBase):
     event_type: Literal[NotificationEventTypeEnum.LOGIN_NOTIFICATION] = (
@@ -154,14 +125,7 @@ class ServerErrorData(BaseModel):
     correlation_id: Optional[str] = None
     source: Optional[str] = None
 
-    occurred_at: datetime = now_utc()
-
-    @field_validator("occurred_at")
-    @classmethod
-    def validate_utc_datetime(cls, v: datetime) -> datetime:
-        if v.tzinfo is None:
-            raise ValueError("Datetime must be timezone-aware")
-        return v.astimezone(timezone.utc)
+    occurred_at: UtcDatetime = Field(default_factory=now_utc)
 
 
 class ServerNotificationEvent(BaseModel):
@@ -171,14 +135,7 @@ class ServerNotificationEvent(BaseModel):
         NotificationEventTypeEnum.ERROR_CAUGHT
     )
     error_data: ServerErrorData
-    timestamp: datetime = now_utc()
-
-    @field_validator("timestamp")
-    @classmethod
-    def validate_utc_datetime(cls, v: datetime) -> datetime:
-        if v.tzinfo is None:
-            raise ValueError("Datetime must be timezone-aware")
-        return v.astimezone(timezone.utc)
+    timestamp: UtcDatetime = Field(default_factory=now_utc)
 
 
 # ================================
@@ -192,18 +149,11 @@ class JobExecuteEvent(BaseModel):
     event_type: Literal[JobEventTypeEnum.JOB_EXECUTE] = JobEventTypeEnum.JOB_EXECUTE
     job_id: UUID
     job_type: str  # JobTypeEnum value from job_scheduler
-    scheduled_for: datetime
-    sent_at: datetime
+    scheduled_for: UtcDatetime
+    sent_at: UtcDatetime
     timeout_seconds: int = 300
     metadata: Optional[Dict[str, Any]] = None
 
-    @field_validator("scheduled_for", "sent_at")
-    @classmethod
-    def validate_utc_datetime(cls, v: datetime) -> datetime:
-        if v.tzinfo is None:
-            raise ValueError("Datetime must be timezone-aware")
-        return v.astimezone(timezone.utc)
-
 
 class JobCompletedEvent(BaseModel):
     """Job completion response (FastAPI → Scheduler)"""
@@ -212,73 +162,43 @@ class JobCompletedEvent(BaseModel):
         JobEventTypeEnum.JOB_COMPLETED
     )
     job_id: UUID
-    completed_at: datetime
+    completed_at: UtcDatetime
     execution_duration_ms: Optional[int] = None
     result: Optional[Dict[str, Any]] = None
 
-    @field_validator("completed_at")
-    @classmethod
-    def validate_utc_datetime(cls, v: datetime) -> datetime:
-        if v.tzinfo is None:
-            raise ValueError("Datetime must be timezone-aware")
-        return v.astimezone(timezone.utc)
-
 
 class JobFailedEvent(BaseModel):
     """Job failure response (FastAPI → Scheduler)"""
 
     event_type: Literal[JobEventTypeEnum.JOB_FAILED] = JobEventTypeEnum.JOB_FAILED
     job_id: UUID
-    failed_at: datetime
+    failed_at: UtcDatetime
     error_message: str
     should_retry: bool = True
 
-    @field_validator("failed_at")
-    @classmethod
-    def validate_utc_datetime(cls, v: datetime) -> datetime:
-        if v.tzinfo is None:
-            raise ValueError("Datetime must be timezone-aware")
-        return v.astimezone(timezone.utc)
-
 
 # Type unions
 JobEvent = Union[JobExecuteEvent, JobCompletedEvent, JobFailedEvent]
+NotificationEvent = Union[AuthNotificationEvent, ServerNotificationEvent]
 
+# built once, pick the model straight from event_type instead of trying each one
+NotificationEventAdapter: TypeAdapter[NotificationEvent] = TypeAdapter(
+    Annotated[NotificationEvent, Field(discriminator="event_type")]
+)
+JobEventAdapter: TypeAdapter[JobEvent] = TypeAdapter(
+    Annotated[JobEvent, Field(discriminator="event_type")]
+)
 
-def parse_event(
-    event_dict: Dict[str, Any],
-) -> Union[AuthNotificationEvent, ServerNotificationEvent]:
-    event_type = event_dict.get("event_type")
-
-    event_map = {
-        # user notifications
-        NotificationEventTypeEnum.MFA_CODE.value: MfaCodeEvent,
-        NotificationEventTypeEnum.PASSWORD_RESET_CODE.value: PasswordResetCodeEvent,
-        NotificationEventTypeEnum.PASSWORD_RESET_NOTIFICATION.value: PasswordResetNotificationEvent,
-        NotificationEventTypeEnum.LOGIN_NOTIFICATION.value: LoginNotificationEvent,
-        # system notification for admin
-        NotificationEventTypeEnum.ERROR_CAUGHT.value: ServerNotificationEvent,
-    }
-
-    event_class = event_map.get(event_type)
-    if not event_class:
-        raise ValueError(f"Unknown event type: {event_type}")
-
-    return event_class(**event_dict)
-
-
-def parse_job_event(event_dict: Dict[str, Any]) -> JobEvent:
-    """Parse job-related events"""
-    event_type = event_dict.get("event_type")
 
-    event_map = {
-        JobEventTypeEnum.JOB_EXECUTE.value: JobExecuteEvent,
-        JobEventTypeEnum.JOB_COMPLETED.value: JobCompletedEvent,
-        JobEventTypeEnum.JOB_FAILED.value: JobFailedEvent,
-    }
+def parse_event(event_dict: Dict[str, Any]) -> NotificationEvent:
+    # unknown event types raise ValidationError, a ValueError subclass
+    return NotificationEventAdapter.validate_python(event_dict)
 
-    event_class = event_map.get(event_type)
-    if not event_class:
-        raise ValueError(f"Unknown job event type: {event_type}")
 
-    return event_class(**event_dict)
+def parse_job_event(event_dict: Union[Dict[str, Any], bytes]) -> JobEvent:
+    """Parse job-related events, from a decoded dict or a raw JSON message body"""
+    # unknown event types raise ValidationError, a ValueError subclass
+    if isinstance(event_dict, (bytes, bytearray, str)):
+        # parsed and validated in one pass by pydantic-core, no intermediate dict
+        return JobEventAdapter.validate_json(event_dict)
+    return JobEventAdapter.validate_python(event_dict)
@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+from aio_pika.exceptions import ChannelInvalidStateError
+
+from rabbitmq.rabbitmq_controller import _AckBatcher
+
+
+class FakeChannel:
+    def __init__(self):
+        self.is_closed = False
+        self.acks = []
+
+
+class FakeMessage:
+    def __init__(self, channel: FakeChannel, delivery_tag: int, fail_ack: bool = False):
+        self._channel = channel
+        self.delivery_tag = delivery_tag
+        self.fail_ack = fail_ack
+
+    @property
+    def channel(self) -> FakeChannel:
+        if self._channel.is_closed:
+            raise ChannelInvalidStateError
+        return self._channel
+
+    async def ack(self, multiple: bool = False) -> None:
+        if self.fail_ack:
+            raise ConnectionError("ack failed")
+        self.channel.acks.append((self.delivery_tag, multiple))
+
+
+def _deliver(batcher: _AckBatcher, channel: FakeChannel, *tags: int):
+    messages = [FakeMessage(channel, tag) for tag in tags]
+    return [(batcher.track(message), message) for message in messages]
+
+
+@pytest.mark.asyncio
+async def test_ack_stops_below_the_oldest_delivery_in_flight():
+    batcher = _AckBatcher("queue", batch_size=100, flush_interval_ms=60_000)
+    channel = FakeChannel()
+    deliveries = _deliver(batcher, channel, 1, 2, 3, 4)
+
+    # 1, 2 and 4 are done, 3 is still being processed
+    for key, message in (deliveries[0], deliveries[1], deliveries[3]):
+        await batcher.add_processed(key, message)
+    await batcher._flush()
+    assert channel.acks == [(2, True)]
+
+    await batcher.add_processed(*deliveries[2])
+    await batcher._flush()
+    assert channel.acks == [(2, True), (4, True)]
+
+
+@pytest.mark.asyncio
+async def test_acks_are_kept_per_channel():
+    batcher = _AckBatcher("queue", batch_size=100, flush_interval_ms=60_000)
+    first, second = FakeChannel(), FakeChannel()
+    first_deliveries = _deliver(batcher, first, 1, 2)
+    second_deliveries = _deliver(batcher, second, 1, 2)
+
+    # a delivery in flight on the second channel does not hold back the first one
+    await batcher.add_processed(*first_deliveries[0])
+    await batcher.add_processed(*first_deliveries[1])
+    await batcher.add_processed(*second_deliveries[1])
+    await batcher._flush()
+
+    assert first.acks == [(2, True)]
+    assert second.acks == []
+
+
+@pytest.mark.asyncio
+async def test_deliveries_of_a_closed_channel_are_dropped():
+    batcher = _AckBatcher("queue", batch_size=100, flush_interval_ms=60_000)
+    old, new = FakeChannel(), FakeChannel()
+    old_deliveries = _deliver(batcher, old, 1, 2, 3)
+    await batcher.add_processed(*old_deliveries[2])
+
+    # a reconnect closes the old channel, tags start over on the new one
+    old.is_closed = True
+    for key, message in _deliver(batcher, new, 1, 2):
+        await batcher.add_processed(key, message)
+    await batcher._flush()
+
+    assert old.acks == []
+    assert new.acks == [(2, True)]
+    assert batcher._processed == []
+
+
+@pytest.mark.asyncio
+async def test_failed_ack_keeps_the_deliveries_for_the_next_flush():
+    batcher = _AckBatcher("queue", batch_size=100, flush_interval_ms=60_000)
+    channel = FakeChannel()
+    deliveries = _deliver(batcher, channel, 1, 2)
+    deliveries[1][1].fail_ack = True
+    for key, message in deliveries:
+        await batcher.add_processed(key, message)
+
+    await batcher._flush()
+    assert len(batcher._processed) == 2
+
+    deliveries[1][1].fail_ack = False
+    await batcher._flush()
+    assert channel.acks == [(2, True)]
+    assert batcher._processed == []
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_acked_right_away():
+    batcher = _AckBatcher("queue", batch_size=3, flush_interval_ms=60_000)
+    channel = FakeChannel()
+    for key, message in _deliver(batcher, channel, 1, 2, 3, 4):
+        await batcher.add_processed(key, message)
+
+    assert channel.acks == [(3, True)]
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_is_acked_on_the_flush_interval_and_on_stop():
+    batcher = _AckBatcher("queue", batch_size=100, flush_interval_ms=10)
+    batcher.start()
+    channel = FakeChannel()
+    try:
+        await batcher.add_processed(*_deliver(batcher, channel, 1)[0])
+        await asyncio.sleep(0.05)
+        assert channel.acks == [(1, True)]
+
+        await batcher.add_processed(*_deliver(batcher, channel, 2)[0])
+    finally:
+        await batcher.stop()
+    assert channel.acks == [(1, True), (2, True)]
+
+
+@pytest.mark.asyncio
+async def test_stop_does_not_ack_a_delivery_twice_after_a_cancelled_flush():
+    batcher = _AckBatcher("queue", batch_size=100, flush_interval_ms=10)
+    channel = FakeChannel()
+    ack_sent = asyncio.Event()
+
+    class SlowAckMessage(FakeMessage):
+        async def ack(self, multiple: bool = False) -> None:
+            # the frame is out, the cancel lands while waiting on the connection
+            await super().ack(multiple)
+            ack_sent.set()
+            await asyncio.Event().wait()
+
+    message = SlowAckMessage(channel, 1)
+    batcher.start()
+    await batcher.add_processed(batcher.track(message), message)
+    await asyncio.wait_for(ack_sent.wait(), timeout=1)
+
+    await batcher.stop()
+    assert channel.acks == [(1, True)]
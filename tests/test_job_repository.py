@@ -0,0 +1,231 @@
+import uuid
+from datetime import timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from scheduler.config import SCHEDULER_POSTGRES_DATABASE_URL
+from scheduler.database.postgres_database import Base
+from scheduler.models.job import Job, JobStatusEnum, JobTypeEnum
+from scheduler.repositories.job_repository import JobRepository, _READY_JOBS_STATEMENT
+from utils.timezone_utils import now_utc
+
+RETRY_DELAY_SECONDS = 30
+
+
+@pytest_asyncio.fixture
+async def session():
+    engine = create_async_engine(SCHEDULER_POSTGRES_DATABASE_URL, poolclass=NullPool)
+    try:
+        connection = await engine.connect()
+    except Exception as e:
+        await engine.dispose()
+        pytest.skip(f"postgres is not reachable: {e}")
+
+    await connection.run_sync(Base.metadata.create_all)
+    await connection.commit()
+
+    # every test runs in a transaction that is rolled back afterwards
+    transaction = await connection.begin()
+    try:
+        # a session time zone other than UTC, a naive timestamp bind would be shifted by it
+        await connection.execute(text("SET LOCAL TIME ZONE 'Asia/Tokyo'"))
+        async with AsyncSession(bind=connection, expire_on_commit=False) as session:
+            yield session
+    finally:
+        await transaction.rollback()
+        await connection.close()
+        await engine.dispose()
+
+
+async def _insert_jobs(session: AsyncSession, count: int, status: JobStatusEnum):
+    return await JobRepository(session).bulk_insert(
+        [
+            {
+                "job_type": JobTypeEnum.FILE_CLEANUP,
+                "status": status,
+                "scheduled_for": now_utc(),
+                "timeout_seconds": 60,
+                "max_attempts": 3,
+                "attempts_count": 1,
+                "min_retry_delay_seconds": RETRY_DELAY_SECONDS,
+            }
+            for _ in range(count)
+        ]
+    )
+
+
+async def _reload(session: AsyncSession, jobs):
+    result = await session.execute(
+        select(Job)
+        .where(Job.job_id.in_([job.job_id for job in jobs]))
+        .execution_options(populate_existing=True)
+    )
+    return {job.job_id: job for job in result.scalars().all()}
+
+
+def _assert_retry_delay(job: Job, before, after):
+    assert job.next_retry_at.tzinfo is not None
+    delay = timedelta(seconds=RETRY_DELAY_SECONDS)
+    assert before + delay <= job.next_retry_at <= after + delay
+
+
+@pytest.mark.asyncio
+async def test_mark_failed_schedules_retry(session):
+    (job,) = await _insert_jobs(session, 1, JobStatusEnum.SENT)
+    repository = JobRepository(session)
+
+    before = now_utc()
+    marked = await repository.mark_failed(job.job_id, "boom")
+    after = now_utc()
+
+    assert marked.status == JobStatusEnum.FAILED
+    assert marked.error_message == "boom"
+    _assert_retry_delay(marked, before, after)
+
+
+@pytest.mark.asyncio
+async def test_mark_timeout_schedules_retry(session):
+    (job,) = await _insert_jobs(session, 1, JobStatusEnum.SENT)
+    repository = JobRepository(session)
+
+    before = now_utc()
+    marked = await repository.mark_timeout(job.job_id)
+    after = now_utc()
+
+    assert marked.status == JobStatusEnum.TIMEOUT
+    _assert_retry_delay(marked, before, after)
+
+
+@pytest.mark.asyncio
+async def test_bulk_mark_failed_schedules_retries(session):
+    jobs = await _insert_jobs(session, 3, JobStatusEnum.SENT)
+    repository = JobRepository(session)
+
+    before = now_utc()
+    updated = await repository.bulk_mark_failed(
+        [(job.job_id, f"boom {i}") for i, job in enumerate(jobs)]
+    )
+    after = now_utc()
+
+    assert set(updated) == {job.job_id for job in jobs}
+    reloaded = await _reload(session, jobs)
+    for i, job in enumerate(jobs):
+        marked = reloaded[job.job_id]
+        assert marked.status == JobStatusEnum.FAILED
+        assert marked.error_message == f"boom {i}"
+        _assert_retry_delay(marked, before, after)
+
+
+@pytest.mark.asyncio
+async def test_bulk_mark_completed_returns_only_matched_jobs(session):
+    (job,) = await _insert_jobs(session, 1, JobStatusEnum.SENT)
+    repository = JobRepository(session)
+
+    updated = await repository.bulk_mark_completed(
+        [(job.job_id, {"deleted": 3}, 12), (uuid.uuid4(), None, None)]
+    )
+
+    assert updated == [job.job_id]
+    marked = (await _reload(session, [job]))[job.job_id]
+    assert marked.status == JobStatusEnum.COMPLETED
+    assert marked.result == {"deleted": 3}
+    assert marked.execution_duration_ms == 12
+
+
+@pytest.mark.asyncio
+async def test_bulk_mark_completed_without_any_duration(session):
+    # an all-NULL VALUES column is typed text unless cast back to the column type
+    jobs = await _insert_jobs(session, 2, JobStatusEnum.SENT)
+    repository = JobRepository(session)
+
+    updated = await repository.bulk_mark_completed(
+        [(job.job_id, None, None) for job in jobs]
+    )
+
+    assert set(updated) == {job.job_id for job in jobs}
+    reloaded = await _reload(session, jobs)
+    for job in jobs:
+        assert reloaded[job.job_id].status == JobStatusEnum.COMPLETED
+        assert reloaded[job.job_id].execution_duration_ms is None
+
+
+@pytest.mark.asyncio
+async def test_bulk_mark_completed_with_some_durations(session):
+    without_duration, with_duration = await _insert_jobs(session, 2, JobStatusEnum.SENT)
+    repository = JobRepository(session)
+
+    updated = await repository.bulk_mark_completed(
+        [(without_duration.job_id, None, None), (with_duration.job_id, {"sent": 1}, 40)]
+    )
+
+    assert set(updated) == {without_duration.job_id, with_duration.job_id}
+    reloaded = await _reload(session, [without_duration, with_duration])
+    assert reloaded[without_duration.job_id].execution_duration_ms is None
+    assert reloaded[with_duration.job_id].execution_duration_ms == 40
+    assert reloaded[with_duration.job_id].result == {"sent": 1}
+
+
+@pytest.mark.asyncio
+async def test_bulk_mark_timeout_only_marks_the_given_attempt(session):
+    current, stale = await _insert_jobs(session, 2, JobStatusEnum.SENT)
+    repository = JobRepository(session)
+
+    before = now_utc()
+    marked = await repository.bulk_mark_timeout(
+        [(current.job_id, current.attempts_count), (stale.job_id, stale.attempts_count - 1)]
+    )
+    after = now_utc()
+
+    assert [job.job_id for job in marked] == [current.job_id]
+    assert marked[0].status == JobStatusEnum.TIMEOUT
+    _assert_retry_delay(marked[0], before, after)
+
+    reloaded = await _reload(session, [stale])
+    assert reloaded[stale.job_id].status == JobStatusEnum.SENT
+    assert reloaded[stale.job_id].next_retry_at is None
+
+
+@pytest.mark.asyncio
+async def test_ready_jobs_generic_plan_uses_the_partial_indexes(session):
+    # finished history the partial indexes let the poll skip
+    await _insert_jobs(session, 10_000, JobStatusEnum.COMPLETED)
+    await _insert_jobs(session, 5, JobStatusEnum.PENDING)
+    await _insert_jobs(session, 5, JobStatusEnum.FAILED)
+    await session.execute(text("ANALYZE jobs"))
+
+    # the statement exactly as asyncpg prepares it, planned the way its statement cache
+    # ends up planning it once postgres switches to a generic plan
+    sql = _READY_JOBS_STATEMENT.params(now=now_utc(), limit=100).compile(
+        dialect=session.bind.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    connection = await (await session.connection()).get_raw_connection()
+    driver = connection.driver_connection
+    await driver.execute("SET LOCAL plan_cache_mode = force_generic_plan")
+    await driver.execute(f"PREPARE ready_jobs AS {sql}")
+    try:
+        plan = "\n".join(
+            row[0] for row in await driver.fetch("EXPLAIN EXECUTE ready_jobs(now(), 100)")
+        )
+    finally:
+        await driver.execute("DEALLOCATE ready_jobs")
+
+    assert "ix_jobs_pending_scheduled" in plan
+    assert "ix_jobs_retry" in plan
+
+
+@pytest.mark.asyncio
+async def test_get_recent_jobs_loads_whole_rows(session):
+    jobs = await _insert_jobs(session, 2, JobStatusEnum.PENDING)
+    # a fresh identity map so the rows are loaded by the listing query itself
+    session.expunge_all()
+
+    recent = await JobRepository(session).get_recent_jobs(limit=2)
+
+    assert {job.job_id for job in recent} == {job.job_id for job in jobs}
+    for job in recent:
+        assert "result" in job.__dict__
+        assert "job_metadata" in job.__dict__
@@ -0,0 +1,240 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.exc import DataError, DBAPIError
+
+from schemas.rabbitmq_events import JobCompletedEvent, JobFailedEvent
+from scheduler.consumers import job_result_batcher as batcher_module
+from scheduler.consumers.job_result_batcher import JobResultBatcher, is_permanent_error
+from utils.timezone_utils import now_utc
+
+
+class FakeJobRepository:
+    """Records every batch, each one committed in its own fake transaction"""
+
+    def __init__(self):
+        self.batches = []
+        # ids passed to bulk_mark_completed and bulk_mark_failed
+        self.completed = []
+        self.failed = []
+        self.fail = False
+        # jobs whose result postgres refuses to store, the whole transaction fails with them
+        self.unstorable = set()
+        # a statement postgres rejects whatever rows it is given
+        self.statement_error = False
+
+    def __call__(self, session):
+        return self
+
+    async def bulk_mark_completed(self, rows):
+        if self.fail:
+            raise ConnectionError("database is gone")
+        if self.statement_error:
+            raise DBAPIError("UPDATE jobs", {}, FakeDriverError("42804"))
+        if self.unstorable.intersection(job_id for job_id, _, _ in rows):
+            raise DataError("UPDATE jobs", {}, ValueError("value out of int32 range"))
+        self.batches.append([job_id for job_id, _, _ in rows])
+        self.completed.extend(job_id for job_id, _, _ in rows)
+        return [job_id for job_id, _, _ in rows]
+
+    async def bulk_mark_failed(self, rows):
+        if rows:
+            self.batches[-1].extend(job_id for job_id, _ in rows)
+        self.failed.extend(job_id for job_id, _ in rows)
+        return [job_id for job_id, _ in rows]
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    repository = FakeJobRepository()
+
+    @asynccontextmanager
+    async def fake_db_context():
+        yield None
+
+    monkeypatch.setattr(batcher_module, "JobRepository", repository)
+    monkeypatch.setattr(batcher_module, "get_db_context", fake_db_context)
+    return repository
+
+
+def _completed(job_id=None) -> JobCompletedEvent:
+    return JobCompletedEvent(job_id=job_id or uuid.uuid4(), completed_at=now_utc())
+
+
+def _failed(job_id=None) -> JobFailedEvent:
+    return JobFailedEvent(
+        job_id=job_id or uuid.uuid4(), failed_at=now_utc(), error_message="boom"
+    )
+
+
+@pytest.mark.asyncio
+async def test_submit_requires_start(repository):
+    with pytest.raises(RuntimeError):
+        await JobResultBatcher(batch_size=10, flush_interval_ms=10).submit(_completed())
+
+
+@pytest.mark.asyncio
+async def test_events_are_split_into_batches_of_batch_size(repository):
+    batcher = JobResultBatcher(batch_size=2, flush_interval_ms=60_000)
+    batcher.start()
+    try:
+        events = [_completed() for _ in range(4)]
+        await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(event) for event in events)), timeout=1
+        )
+    finally:
+        await batcher.stop()
+
+    assert [len(batch) for batch in repository.batches] == [2, 2]
+    assert sum(repository.batches, []) == [event.job_id for event in events]
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_is_written_after_the_flush_interval(repository):
+    batcher = JobResultBatcher(batch_size=100, flush_interval_ms=20)
+    batcher.start()
+    try:
+        completed, failed = _completed(), _failed()
+        await asyncio.wait_for(
+            asyncio.gather(batcher.submit(completed), batcher.submit(failed)), timeout=1
+        )
+    finally:
+        await batcher.stop()
+
+    assert repository.batches == [[completed.job_id, failed.job_id]]
+
+
+@pytest.mark.asyncio
+async def test_last_result_for_a_job_wins(repository):
+    batcher = JobResultBatcher(batch_size=100, flush_interval_ms=20)
+    batcher.start()
+    job_id = uuid.uuid4()
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(
+                batcher.submit(_failed(job_id)), batcher.submit(_completed(job_id))
+            ),
+            timeout=1,
+        )
+    finally:
+        await batcher.stop()
+
+    assert repository.batches == [[job_id]]
+    assert repository.completed == [job_id]
+    assert repository.failed == []
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_a_batch_still_being_collected(repository):
+    batcher = JobResultBatcher(batch_size=100, flush_interval_ms=60_000)
+    batcher.start()
+    event = _completed()
+    submitted = asyncio.create_task(batcher.submit(event))
+    # the event is dequeued and the batcher waits for more to fill its batch
+    await asyncio.sleep(0.01)
+    assert repository.batches == []
+
+    await batcher.stop()
+    await asyncio.wait_for(submitted, timeout=1)
+    assert repository.batches == [[event.job_id]]
+
+
+@pytest.mark.asyncio
+async def test_failed_write_raises_in_submit(repository):
+    repository.fail = True
+    batcher = JobResultBatcher(batch_size=1, flush_interval_ms=10)
+    batcher.start()
+    try:
+        with pytest.raises(ConnectionError):
+            await asyncio.wait_for(batcher.submit(_completed()), timeout=1)
+    finally:
+        await batcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_unstorable_result_only_fails_its_own_submit(repository):
+    batcher = JobResultBatcher(batch_size=100, flush_interval_ms=20)
+    batcher.start()
+    events = [_completed() for _ in range(5)]
+    repository.unstorable.add(events[2].job_id)
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                *(batcher.submit(event) for event in events), return_exceptions=True
+            ),
+            timeout=1,
+        )
+    finally:
+        await batcher.stop()
+
+    assert isinstance(results[2], DataError)
+    assert [result for i, result in enumerate(results) if i != 2] == [None] * 4
+    stored = sum(repository.batches, [])
+    assert sorted(stored) == sorted(e.job_id for i, e in enumerate(events) if i != 2)
+
+
+@pytest.mark.asyncio
+async def test_statement_error_fails_every_submit_as_permanent(repository):
+    repository.statement_error = True
+    batcher = JobResultBatcher(batch_size=100, flush_interval_ms=20)
+    batcher.start()
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                *(batcher.submit(_completed()) for _ in range(4)),
+                return_exceptions=True,
+            ),
+            timeout=1,
+        )
+    finally:
+        await batcher.stop()
+
+    # the consumer rejects these without requeue instead of retrying them forever
+    assert all(
+        isinstance(result, DBAPIError) and is_permanent_error(result)
+        for result in results
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_connection_fails_the_whole_batch(repository):
+    repository.fail = True
+    batcher = JobResultBatcher(batch_size=100, flush_interval_ms=20)
+    batcher.start()
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                *(batcher.submit(_completed()) for _ in range(3)),
+                return_exceptions=True,
+            ),
+            timeout=1,
+        )
+    finally:
+        await batcher.stop()
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+class FakeDriverError(Exception):
+    def __init__(self, sqlstate=None):
+        super().__init__("driver error")
+        self.sqlstate = sqlstate
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (DataError("UPDATE jobs", {}, FakeDriverError()), True),
+        # a NUL byte in a JSONB value, raised as a plain driver error with its SQLSTATE
+        (DBAPIError("UPDATE jobs", {}, FakeDriverError("22P05")), True),
+        (DBAPIError("UPDATE jobs", {}, FakeDriverError("23503")), True),
+        # a statement postgres rejects for every row, no split of the batch fixes it
+        (DBAPIError("UPDATE jobs", {}, FakeDriverError("42804")), True),
+        (DBAPIError("UPDATE jobs", {}, FakeDriverError("08006")), False),
+        (ConnectionError("database is gone"), False),
+    ],
+)
+def test_is_permanent_error(error, expected):
+    assert is_permanent_error(error) is expected
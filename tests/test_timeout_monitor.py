@@ -0,0 +1,154 @@
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+
+from scheduler.jobs import timeout_monitor as monitor_module
+from scheduler.jobs.timeout_monitor import TimeoutMonitor
+
+
+class FakeJob:
+    def __init__(self, job_id, attempts_count):
+        self.job_id = job_id
+        self.attempts_count = attempts_count
+        self.max_attempts = 3
+        self.timeout_seconds = 1
+
+    def is_retriable(self) -> bool:
+        return self.attempts_count < self.max_attempts
+
+
+class FakeJobRepository:
+    """Jobs are sent on their current attempt, like the UPDATE only stale attempts match nothing"""
+
+    def __init__(self):
+        self.current_attempts = {}
+        self.sent_job_deadlines = []
+        self.timeout_calls = []
+        self.failures_left = 0
+
+    def __call__(self, session):
+        return self
+
+    async def get_sent_job_deadlines(self):
+        return self.sent_job_deadlines
+
+    async def bulk_mark_timeout(self, attempts):
+        if self.failures_left:
+            self.failures_left -= 1
+            raise ConnectionError("database is gone")
+
+        self.timeout_calls.append(list(attempts))
+        marked = [
+            FakeJob(job_id, attempts_count)
+            for job_id, attempts_count in attempts
+            if self.current_attempts.get(job_id) == attempts_count
+        ]
+        for job in marked:
+            del self.current_attempts[job.job_id]
+        return marked
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    repository = FakeJobRepository()
+
+    @asynccontextmanager
+    async def fake_db_context():
+        yield None
+
+    monkeypatch.setattr(monitor_module, "JobRepository", repository)
+    monkeypatch.setattr(monitor_module, "get_db_context", fake_db_context)
+    monkeypatch.setattr(monitor_module, "EXPIRE_RETRY_DELAY_SECONDS", 0.01)
+    return repository
+
+
+@pytest_asyncio.fixture
+async def monitor(repository):
+    monitor = TimeoutMonitor()
+    yield monitor
+    await monitor.stop()
+
+
+async def _wait_for_timeouts(repository: FakeJobRepository, count: int) -> None:
+    async def _wait():
+        while len(repository.timeout_calls) < count:
+            await asyncio.sleep(0.005)
+
+    await asyncio.wait_for(_wait(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_expired_deadline_times_out_the_attempt(repository, monitor):
+    job_id = uuid.uuid4()
+    repository.current_attempts[job_id] = 1
+    await monitor.start()
+
+    await monitor.arm(job_id, time.time() + 0.02, 1)
+    await _wait_for_timeouts(repository, 1)
+
+    assert repository.timeout_calls == [[(job_id, 1)]]
+    assert job_id not in repository.current_attempts
+
+
+@pytest.mark.asyncio
+async def test_earlier_deadline_wakes_the_monitor(repository, monitor):
+    late, early = uuid.uuid4(), uuid.uuid4()
+    repository.current_attempts.update({late: 1, early: 1})
+    await monitor.start()
+
+    await monitor.arm(late, time.time() + 60, 1)
+    await monitor.arm(early, time.time() + 0.02, 1)
+    await _wait_for_timeouts(repository, 1)
+
+    assert repository.timeout_calls == [[(early, 1)]]
+
+
+@pytest.mark.asyncio
+async def test_stale_attempt_does_not_time_out_the_retry(repository, monitor):
+    job_id = uuid.uuid4()
+    # the first attempt failed and the job was sent again
+    repository.current_attempts[job_id] = 2
+    await monitor.start()
+
+    deadline = time.time() + 0.02
+    await monitor.arm(job_id, deadline, 1)
+    await _wait_for_timeouts(repository, 1)
+    assert repository.current_attempts == {job_id: 2}
+
+    await monitor.arm(job_id, time.time() + 0.02, 2)
+    await _wait_for_timeouts(repository, 2)
+    assert repository.current_attempts == {}
+
+
+@pytest.mark.asyncio
+async def test_sent_jobs_are_rearmed_on_start(repository, monitor):
+    job_id = uuid.uuid4()
+    repository.current_attempts[job_id] = 1
+    # sent before the restart and already past its timeout
+    repository.sent_job_deadlines = [
+        (job_id, datetime(2020, 1, 1, tzinfo=timezone.utc), 60, 1)
+    ]
+
+    await monitor.start()
+    await _wait_for_timeouts(repository, 1)
+
+    assert repository.timeout_calls == [[(job_id, 1)]]
+
+
+@pytest.mark.asyncio
+async def test_failed_update_is_retried(repository, monitor):
+    job_id = uuid.uuid4()
+    repository.current_attempts[job_id] = 1
+    repository.failures_left = 1
+    await monitor.start()
+
+    await monitor.arm(job_id, time.time(), 1)
+    await _wait_for_timeouts(repository, 1)
+
+    assert repository.timeout_calls == [[(job_id, 1)]]
+    assert repository.current_attempts == {}
@@ -1,5 +1,7 @@
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Annotated, Optional
+
+from pydantic import AfterValidator
 
 
 def now_utc() -> datetime:
@@ -28,6 +30,10 @@ def validate_utc_datetime(dt: datetime) -> datetime:
     return dt.astimezone(timezone.utc)
 
 
+# pydantic field type validated by validate_utc_datetime, one validator shared by every schema
+UtcDatetime = Annotated[datetime, AfterValidator(validate_utc_datetime)]
+
+
 def format_iso_utc(dt: datetime) -> str:
     utc_dt = ensure_utc(dt)
     return utc_dt.isoformat() if utc_dt else ""